@@ -1,7 +1,7 @@
 import os
 import argparse
 
-from services.supabase_client import get_user_by_email, get_latest_draft, mark_latest_draft_sent
+from services.supabase_client import get_user_by_email, get_latest_draft_for_send, mark_draft_sent
 from services.content_fetcher import fetch_all_sources
 from services.newsletter_generator import generate_and_save_draft
 from services.resend_client import send_email
@@ -9,6 +9,7 @@ from utils.formatting import markdown_to_html
 
 
 def run_for_email(email: str, *, temperature: float = 0.7, num_links: int = 5) -> None:
+    # Each step needs the previous one's result (user → content → draft → sent), so they run in order
     user = get_user_by_email(email=email)
     if not user:
         raise SystemExit(f"User not found: {email}")
@@ -23,10 +24,11 @@ def run_for_email(email: str, *, temperature: float = 0.7, num_links: int = 5) -
         print("No draft generated (no content).")
         return
 
-    # 3) Send
-    html = markdown_to_html(draft_text)
+    # 3) Send the HTML rendered at generation time; only flag the draft as sent once Resend has accepted it
+    draft = get_latest_draft_for_send(user_id=user_id)
+    html = draft.get("draft_html") or markdown_to_html(draft["draft_text"])
     send_email(to_email=email, subject="Your CreatorPulse Draft", html_content=html)
-    mark_latest_draft_sent(user_id=user_id)
+    mark_draft_sent(draft_id=draft["id"])
     print("Draft sent.")
 
 
@@ -1,9 +1,10 @@
 import os
+import threading
 from pathlib import Path
 
 import streamlit as st
 from dotenv import load_dotenv
-from utils.ui import inject_global_css
+from utils.ui import inject_global_css, show_flash
 
 # Load environment variables from .env file
 load_dotenv()
@@ -18,15 +19,32 @@ except Exception as e:
 # Local imports
 from services.supabase_client import (
     get_client,
-    get_current_user,
+    get_session_user,
+    clear_session_user,
     sign_in_with_password,
     sign_up_with_password,
     sign_out,
-    get_user_workspaces,
+    cached_user_workspaces,
     create_workspace,
 )
 
 
+def _preload_page_modules():
+    import services.content_fetcher  # noqa: F401
+    import services.newsletter_generator  # noqa: F401
+    import services.resend_client  # noqa: F401
+    import utils.formatting  # noqa: F401
+
+
+@st.cache_resource(show_spinner=False)
+def _start_preload():
+    # Warm the Dashboard's heavier imports off the script thread, once per process,
+    # so the first Dashboard visit doesn't pay for them
+    thread = threading.Thread(target=_preload_page_modules, daemon=True)
+    thread.start()
+    return thread
+
+
 def require_env():
     missing = []
     for key in [
@@ -55,60 +73,95 @@ def ensure_session_keys():
         st.session_state["current_workspace"] = None
 
 
+def _clear_auth_cache():
+    st.session_state.pop("_auth_cache", None)
+
+
+def _do_login():
+    try:
+        sign_in_with_password(email=st.session_state["login_email"], password=st.session_state["login_password"])
+        _clear_auth_cache()
+        clear_session_user()
+    except Exception as e:
+        st.session_state["_login_flash"] = ("error", f"Login failed: {e}")
+
+
+def _do_signup():
+    email = st.session_state["signup_email"]
+    password = st.session_state["signup_pw"]
+    name = st.session_state["signup_name"]
+    timezone = st.session_state["signup_timezone"]
+    try:
+        # Validate inputs
+        if not security_validator.validate_email(email):
+            st.session_state["_signup_flash"] = ("error", "Please enter a valid email address.")
+            return
+        
+        if len(password) < 8:
+            st.session_state["_signup_flash"] = ("error", "Password must be at least 8 characters long.")
+            return
+        
+        if not name or len(name.strip()) < 2:
+            st.session_state["_signup_flash"] = ("error", "Please enter a valid name.")
+            return
+        
+        # Sanitize inputs
+        email = security_validator.sanitize_input(email, max_length=255)
+        name = security_validator.sanitize_input(name, max_length=100)
+        timezone = security_validator.sanitize_input(timezone, max_length=50)
+        
+        sign_up_with_password(email=email, password=password, name=name, timezone=timezone)
+        st.session_state["_signup_flash"] = ("success", "Account created. Please log in.")
+    except Exception as e:
+        st.session_state["_signup_flash"] = ("error", f"Signup failed: {e}")
+        # Track error
+        try:
+            monitoring.track_error(e, {"action": "signup", "email": email})
+        except:
+            pass
+
+
 def render_auth():
     st.title("CreatorPulse — Login / Signup")
     tabs = st.tabs(["Login", "Signup"])
 
+    # Form actions run as callbacks, so the rerun Streamlit already does on submit
+    # renders the result and no extra st.rerun() is needed
     with tabs[0]:
         with st.form("login_form"):
-            email = st.text_input("Email")
-            password = st.text_input("Password", type="password")
-            submitted = st.form_submit_button("Login")
-        if submitted:
-            try:
-                sign_in_with_password(email=email, password=password)
-                st.success("Logged in.")
-                st.rerun()
-            except Exception as e:
-                st.error(f"Login failed: {e}")
+            st.text_input("Email", key="login_email")
+            st.text_input("Password", type="password", key="login_password")
+            st.form_submit_button("Login", on_click=_do_login)
+        show_flash("_login_flash")
 
     with tabs[1]:
         with st.form("signup_form"):
-            email = st.text_input("Email", key="signup_email")
-            password = st.text_input("Password", type="password", key="signup_pw")
-            name = st.text_input("Name")
-            timezone = st.text_input("Timezone (e.g. UTC, PST)")
-            submitted = st.form_submit_button("Create account")
-        if submitted:
-            try:
-                # Validate inputs
-                if not security_validator.validate_email(email):
-                    st.error("Please enter a valid email address.")
-                    return
-                
-                if len(password) < 8:
-                    st.error("Password must be at least 8 characters long.")
-                    return
-                
-                if not name or len(name.strip()) < 2:
-                    st.error("Please enter a valid name.")
-                    return
-                
-                # Sanitize inputs
-                email = security_validator.sanitize_input(email, max_length=255)
-                name = security_validator.sanitize_input(name, max_length=100)
-                timezone = security_validator.sanitize_input(timezone, max_length=50)
-                
-                sign_up_with_password(email=email, password=password, name=name, timezone=timezone)
-                st.success("Account created. Please log in.")
-                st.rerun()
-            except Exception as e:
-                st.error(f"Signup failed: {e}")
-                # Track error
-                try:
-                    monitoring.track_error(e, {"action": "signup", "email": email})
-                except:
-                    pass
+            st.text_input("Email", key="signup_email")
+            st.text_input("Password", type="password", key="signup_pw")
+            st.text_input("Name", key="signup_name")
+            st.text_input("Timezone (e.g. UTC, PST)", key="signup_timezone")
+            st.form_submit_button("Create account", on_click=_do_signup)
+        show_flash("_signup_flash")
+
+
+def _do_create_workspace(user_id):
+    name = st.session_state["new_workspace_name"]
+    slug = st.session_state["new_workspace_slug"]
+    if not (name and slug):
+        return
+    try:
+        create_workspace(name=name, slug=slug, owner_id=user_id)
+        cached_user_workspaces.clear(user_id)
+        st.session_state["show_create_workspace"] = False
+        st.session_state["_workspace_flash"] = ("success", "Workspace created!")
+    except Exception as e:
+        st.session_state["_workspace_flash"] = ("error", f"Failed: {e}")
+
+
+def _do_logout():
+    sign_out()
+    _clear_auth_cache()
+    clear_session_user()
 
 
 def render_home():
@@ -116,14 +169,15 @@ def render_home():
     inject_global_css()
     require_env()
     ensure_session_keys()
+    _start_preload()
 
-    user = get_current_user()
+    user = get_session_user()
     if not user:
         render_auth()
         return
 
     # Workspace selection
-    workspaces = get_user_workspaces(user_id=user["id"])
+    workspaces = cached_user_workspaces(user["id"])
     
     st.sidebar.success(f"Logged in as {user.get('email')}")
     
@@ -133,7 +187,8 @@ def render_home():
         selected_workspace_name = st.sidebar.selectbox(
             "Select Workspace",
             options=list(workspace_options.keys()),
-            index=0
+            index=0,
+            on_change=_clear_auth_cache
         )
         st.session_state["current_workspace"] = workspace_options[selected_workspace_name]
     else:
@@ -146,22 +201,13 @@ def render_home():
         st.sidebar.markdown("---")
         st.sidebar.markdown("### Create Workspace")
         with st.sidebar.form("quick_create_workspace"):
-            name = st.text_input("Name", placeholder="My Workspace")
-            slug = st.text_input("Slug", placeholder="my-workspace")
-            submitted = st.form_submit_button("Create")
-        
-        if submitted and name and slug:
-            try:
-                create_workspace(name=name, slug=slug, owner_id=user["id"])
-                st.sidebar.success("Workspace created!")
-                st.session_state["show_create_workspace"] = False
-                st.rerun()
-            except Exception as e:
-                st.sidebar.error(f"Failed: {e}")
+            st.text_input("Name", placeholder="My Workspace", key="new_workspace_name")
+            st.text_input("Slug", placeholder="my-workspace", key="new_workspace_slug")
+            st.form_submit_button("Create", on_click=_do_create_workspace, args=(user["id"],))
+    with st.sidebar:
+        show_flash("_workspace_flash")
     
-    if st.sidebar.button("Logout"):
-        sign_out()
-        st.rerun()
+    st.sidebar.button("Logout", on_click=_do_logout)
 
     st.title("CreatorPulse")
     st.caption("Your AI-powered daily feed curator and newsletter generator.")
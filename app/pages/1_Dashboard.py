@@ -1,174 +1,217 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import streamlit as st
 from utils.ui import (
     inject_global_css, header, section_header, metric_card, 
     progress_bar, empty_state, success_card, warning_card, 
-    info_card, loading_spinner, status_badge
+    error_card, info_card, loading_spinner, status_badge
+)
+from utils.formatting import markdown_to_html, inject_tracking, unified_diff
+from services.analytics_service import track_email_sent
+from services.content_fetcher import fetch_all_sources
+from services.newsletter_generator import generate_and_save_draft
+from services.resend_client import send_email
+from services.supabase_client import (
+    cached_list_recent_content, cached_list_drafts, get_session_user, get_dashboard_bootstrap,
+    cached_latest_draft, save_draft_feedback, save_draft_edit, mark_latest_draft_sent, track_usage,
+    get_draft_body,
 )
-from services.supabase_client import list_recent_content, list_drafts, get_current_user, get_user_workspace_role
+
+
+_AUTH_CACHE_TTL_SECONDS = 300
+# One worker per concurrently fetching session: each session has at most one fetch in flight,
+# and the fetch itself is mostly waiting on feeds, so threads are cheap; extra sessions queue
+_FETCH_WORKERS = int(os.getenv("DASHBOARD_FETCH_WORKERS", "8"))
 
 
 def auth_guard():
-    user = get_current_user()
+    # get_session_user re-verifies the login on its own TTL; only the role lookup is reused here
+    user = get_session_user()
     if not user:
         st.error("Please login from the main page.")
         st.stop()
+
+    # Reuse the resolved role across reruns; cleared on logout and workspace switch
+    current_workspace = st.session_state.get("current_workspace")
+    cached = st.session_state.get("_auth_cache")
+    if (
+        cached
+        and current_workspace
+        and cached["user"]["id"] == user["id"]
+        and cached["workspace_id"] == current_workspace["workspace_id"]
+        and time.time() - cached["ts"] < _AUTH_CACHE_TTL_SECONDS
+    ):
+        return user, current_workspace, cached["role"]
     
     # Check workspace context
-    current_workspace = st.session_state.get("current_workspace")
     if not current_workspace:
         st.error("Please select a workspace from the main page.")
         st.stop()
     
-    # Check user role in workspace
+    # Role, recent content and drafts in a single round-trip
     workspace_id = current_workspace["workspace_id"]
-    user_role = get_user_workspace_role(user_id=user["id"], workspace_id=workspace_id)
+    bootstrap = get_dashboard_bootstrap(user_id=user["id"], workspace_id=workspace_id)
+    st.session_state.setdefault("dashboard_bootstrap", {})[(user["id"], workspace_id)] = bootstrap
+    st.session_state["_auth_cache"] = {
+        "user": user,
+        "role": bootstrap["role"],
+        "workspace_id": workspace_id,
+        "ts": time.time(),
+    }
     
-    return user, current_workspace, user_role
+    return user, current_workspace, bootstrap["role"]
 
 
-def render():
-    st.set_page_config(page_title="Dashboard — CreatorPulse", page_icon="📊", layout="wide")
-    inject_global_css()
-    user, current_workspace, user_role = auth_guard()
+def _ordered_items(items, metric, user_id, workspace_id):
+    # The same 50 most recent items, re-ordered in Postgres; the cache keeps a shuffle stable across reruns
+    if metric == "Title length":
+        return cached_list_recent_content(user_id, workspace_id, 50, "title_length")
+    if metric == "Random":
+        return cached_list_recent_content(user_id, workspace_id, 50, "random")
+    # Recency: the query already returns newest first
+    return items
 
-    workspace_name = current_workspace["workspaces"]["name"]
-    workspace_id = current_workspace["workspace_id"]
-    
-    header("Dashboard", f"Generate your curated newsletter draft and send via email. Workspace: {workspace_name} ({user_role})")
 
-    # Quick Stats Row
-    items = list_recent_content(user_id=user["id"], workspace_id=workspace_id, limit=50)
-    drafts = list_drafts(user_id=user["id"], limit=10)
-    
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        metric_card(str(len(items)), "Content Items", "📰")
-    with col2:
-        metric_card(str(len(drafts)), "Drafts Created", "📝")
-    with col3:
-        sent_drafts = len([d for d in drafts if d.get("sent_at")])
-        metric_card(str(sent_drafts), "Newsletters Sent", "📧")
-    with col4:
-        metric_card(f"{len(items)/5:.1f}", "Avg Items/Day", "📊")
+def _clear_content_caches(user_id, workspace_id):
+    # Only this user's content entries, in the call forms used on this page
+    cached_list_recent_content.clear(user_id, workspace_id, 50)
+    cached_list_recent_content.clear(user_id, workspace_id, 50, "title_length")
+    cached_list_recent_content.clear(user_id, workspace_id, 50, "random")
 
-    st.divider()
 
-    with st.sidebar:
-        section_header("🎛️ Generate Options")
-        temperature = st.slider("Creativity", min_value=0.0, max_value=1.0, value=0.7, step=0.05, help="Higher values = more creative content")
-        num_links = st.slider("Number of links", min_value=3, max_value=10, value=5, help="How many curated links to include")
-        num_trends = st.slider("Trends to include", min_value=0, max_value=5, value=3, help="Number of trending topics to feature")
-        
-        st.divider()
-        section_header("📰 Newsletter Sections")
-        include_intro = st.checkbox("Include Intro", value=True, help="Add a personalized introduction")
-        include_links = st.checkbox("Include Curated Links", value=True, help="Include your selected content")
-        include_trends = st.checkbox("Include Trends to Watch", value=True, help="Add trending topics section")
-        
-        st.divider()
-        section_header("🎨 Appearance")
-        theme = st.radio("Theme", ["Dark", "Light"], index=0)
-        accent = st.selectbox("Accent color", ["Purple", "Blue", "Green"], index=0)
-        st.caption("Theme options apply on next reload.")
+def _clear_draft_caches(user_id):
+    # Only this user's draft entries, including the search currently shown
+    cached_latest_draft.clear(user_id)
+    cached_list_drafts.clear(user_id, 10)
+    cached_list_drafts.clear(user_id, 20, "")
+    q = (st.session_state.get("drafts_search") or "").strip()
+    if q:
+        cached_list_drafts.clear(user_id, 20, q)
 
-    col1, col2 = st.columns([2, 1])
-    with col1:
-        section_header("📥 Fetch and Select Content", "Get fresh content from your sources")
-        
-        # Fetch button with better styling
-        fetch_col1, fetch_col2 = st.columns([1, 3])
-        with fetch_col1:
-            if st.button("🔄 Fetch Content", type="primary", use_container_width=True):
-                with st.spinner("Fetching content..."):
-                    from services.content_fetcher import fetch_all_sources
-                    try:
-                        num_items = fetch_all_sources(user_id=user["id"], workspace_id=workspace_id) or 0
-                        if num_items > 0:
-                            success_card("Content Fetched!", f"Successfully fetched {num_items} new items from your sources.")
-                        else:
-                            warning_card("No New Content", "No new items found. Try again later or check your sources.")
-                    except Exception as e:
-                        error_card("Fetch Failed", f"Error: {e}")
-        
-        with fetch_col2:
-            items = list_recent_content(user_id=user["id"], workspace_id=workspace_id, limit=50)
-            if items:
-                progress_bar(len(items), 50, f"Content Items Available")
-            else:
-                empty_state("📭", "No Content Yet", "Fetch content from your sources to get started", "Fetch Content")
 
-        if items:
-            st.markdown("**Sort by:**")
-            metric = st.radio("Pick top by", ["Recency", "Title length", "Random"], horizontal=True, label_visibility="collapsed")
-            
-            # Sort items based on selected metric
-            if metric == "Title length":
-                items = sorted(items, key=lambda x: len(x.get("title", "")), reverse=True)
-            elif metric == "Random":
-                import random
-                random.shuffle(items)
-            else:  # Recency
-                items = sorted(items, key=lambda x: x.get("created_at", ""), reverse=True)
-            
-            selected_ids = st.multiselect(
-                "Select items to include",
-                options=[it["id"] for it in items],
-                format_func=lambda i: next((f"{x['title'][:50]}... - {x['url'][:30]}..." for x in items if x['id'] == i), str(i)),
-            )
+@st.cache_resource(show_spinner=False)
+def _fetch_executor():
+    # Shared by every session in the process
+    return ThreadPoolExecutor(max_workers=_FETCH_WORKERS, thread_name_prefix="dashboard-fetch")
+
+
+@st.fragment(run_every=2)
+def _fetch_progress(user_id, workspace_id):
+    # Polls the background fetch; only rendered while one is in flight
+    fetch_future = st.session_state["_fetch_future"]
+    if not fetch_future.done():
+        if fetch_future.running():
+            st.caption("⏳ Fetching content...")
         else:
-            selected_ids = []
+            st.caption("⏳ Queued behind other fetches...")
+        return
+    del st.session_state["_fetch_future"]
+    try:
+        st.session_state["_fetch_result"] = ("ok", fetch_future.result() or 0)
+    except Exception as e:
+        st.session_state["_fetch_result"] = ("error", e)
+    _clear_content_caches(user_id, workspace_id)
+    # Full rerun so the item list picks up the new content
+    st.rerun()
 
-    with col2:
-        st.subheader("2) Generate draft")
-        st.caption("Use your style samples and selected content")
-        if st.button("Generate newsletter draft"):
-            from services.newsletter_generator import generate_and_save_draft
-            try:
-                draft_text = generate_and_save_draft(
-                    user_id=user["id"], 
-                    selected_item_ids=selected_ids, 
-                    temperature=temperature, 
-                    num_links=num_links, 
-                    num_trends=num_trends,
-                    include_intro=include_intro,
-                    include_links=include_links,
-                    include_trends=include_trends
-                )
-                if draft_text:
-                    st.success("Draft generated.")
-                else:
-                    st.warning("No draft generated. Add sources and style samples.")
-            except Exception as e:
-                st.error(f"Generation failed: {e}")
 
+def _show_fetch_result():
+    result = st.session_state.pop("_fetch_result", None)
+    if result is None:
+        return
+    status, value = result
+    if status == "error":
+        error_card("Fetch Failed", f"Error: {value}")
+    elif value > 0:
+        success_card("Content Fetched!", f"Successfully fetched {value} new items from your sources.")
+    else:
+        warning_card("No New Content", "No new items found. Try again later or check your sources.")
+
+
+@st.fragment
+def _sidebar_controls():
+    # Widget values live in session state so slider moves only rerun this fragment
+    section_header("🎛️ Generate Options")
+    st.slider("Creativity", min_value=0.0, max_value=1.0, value=0.7, step=0.05, help="Higher values = more creative content", key="gen_temperature")
+    st.slider("Number of links", min_value=3, max_value=10, value=5, help="How many curated links to include", key="gen_num_links")
+    st.slider("Trends to include", min_value=0, max_value=5, value=3, help="Number of trending topics to feature", key="gen_num_trends")
+    
+    st.divider()
+    section_header("📰 Newsletter Sections")
+    st.checkbox("Include Intro", value=True, help="Add a personalized introduction", key="gen_include_intro")
+    st.checkbox("Include Curated Links", value=True, help="Include your selected content", key="gen_include_links")
+    st.checkbox("Include Trends to Watch", value=True, help="Add trending topics section", key="gen_include_trends")
+    
     st.divider()
+    section_header("🎨 Appearance")
+    st.radio("Theme", ["Dark", "Light"], index=0)
+    st.selectbox("Accent color", ["Purple", "Blue", "Green"], index=0)
+    st.caption("Theme options apply on next reload.")
+
+
+@st.fragment
+def _generate_panel(user_id, selected_ids):
+    st.subheader("2) Generate draft")
+    st.caption("Use your style samples and selected content")
+    if st.session_state.pop("_draft_generated", False):
+        st.success("Draft generated.")
+    if st.button("Generate newsletter draft"):
+        try:
+            draft_text = generate_and_save_draft(
+                user_id=user_id, 
+                selected_item_ids=selected_ids, 
+                temperature=st.session_state.get("gen_temperature", 0.7), 
+                num_links=st.session_state.get("gen_num_links", 5), 
+                num_trends=st.session_state.get("gen_num_trends", 3),
+                include_intro=st.session_state.get("gen_include_intro", True),
+                include_links=st.session_state.get("gen_include_links", True),
+                include_trends=st.session_state.get("gen_include_trends", True)
+            )
+            _clear_draft_caches(user_id)
+            if draft_text:
+                # Full rerun so the latest draft editor below picks up the new draft
+                st.session_state["_draft_generated"] = True
+                st.rerun()
+            else:
+                st.warning("No draft generated. Add sources and style samples.")
+        except Exception as e:
+            st.error(f"Generation failed: {e}")
+
+
+@st.fragment
+def _latest_draft_fragment(user, workspace_id, bootstrap_draft=None):
+    # Editing, rating and sending only rerun this section
     st.subheader("Latest draft")
-    from services.supabase_client import get_latest_draft, save_draft_feedback
-    draft = get_latest_draft(user_id=user["id"]) or {}
+    draft = bootstrap_draft or cached_latest_draft(user["id"]) or {}
     draft_text = draft.get("draft_text")
     if draft_text:
         edited = st.text_area("Edit draft before sending", value=draft_text, height=420)
         cols = st.columns(3)
         with cols[0]:
             if st.button("👍 Helpful"):
-                save_draft_feedback(user["id"], edited, feedback="up")
-                st.toast("Feedback saved")
+                try:
+                    save_draft_feedback(user["id"], edited, feedback="up")
+                    st.toast("Feedback saved")
+                except Exception as e:
+                    st.error(f"Saving feedback failed: {e}")
         with cols[1]:
             if st.button("👎 Not great"):
-                save_draft_feedback(user["id"], edited, feedback="down")
-                st.toast("Feedback saved")
+                try:
+                    save_draft_feedback(user["id"], edited, feedback="down")
+                    st.toast("Feedback saved")
+                except Exception as e:
+                    st.error(f"Saving feedback failed: {e}")
         with cols[2]:
             if st.button("Send via email"):
-                from utils.formatting import markdown_to_html, inject_tracking
-                from services.resend_client import send_email
-                from services.supabase_client import get_latest_draft
-                latest = get_latest_draft(user_id=user["id"]) or {}
+                latest = draft
                 html = markdown_to_html(edited)
                 html = inject_tracking(html, user_id=user.get("id"), draft_id=latest.get("id"), api_url="https://npedokgktkcbeltkaovz.supabase.co/functions/v1")
                 try:
                     send_email(to_email=user.get("email"), subject="Your CreatorPulse Draft", html_content=html)
-                    from services.supabase_client import mark_latest_draft_sent, track_usage
                     mark_latest_draft_sent(user_id=user["id"])
+                    _clear_draft_caches(user["id"])
                     
                     # Track usage
                     track_usage(
@@ -180,7 +223,6 @@ def render():
                     
                     # Track analytics
                     try:
-                        from services.analytics_service import track_email_sent
                         track_email_sent(
                             user_id=user["id"],
                             workspace_id=workspace_id,
@@ -193,9 +235,7 @@ def render():
                 except Exception as e:
                     st.error(f"Send failed: {e}")
         if st.button("Save edited draft"):
-            from utils.formatting import unified_diff
-            from services.supabase_client import save_draft_edit, get_latest_draft
-            latest = get_latest_draft(user_id=user["id"]) or {}
+            latest = draft
             diff_text = unified_diff(draft_text, edited)
             try:
                 save_draft_edit(user_id=user["id"], original_draft_id=latest.get("id"), original_text=draft_text, edited_text=edited, diff_text=diff_text)
@@ -205,22 +245,134 @@ def render():
     else:
         st.info("No draft yet. Fetch content and generate a draft.")
 
-    st.divider()
+
+@st.fragment
+def _past_drafts_fragment(user):
+    # Searching and opening past drafts only rerun this section
     st.subheader("Past drafts")
-    q = st.text_input("Search drafts")
-    drafts = list_drafts(user_id=user["id"], limit=20, search=q or "")
-    for d in drafts:
-        with st.expander(f"{d['created_at']} — {'✅ sent' if d.get('sent') else '📝 draft'}"):
-            st.markdown(d.get("draft_text", ""))
-            if st.button("Resend this draft", key=f"resend_{d['id']}"):
-                from utils.formatting import markdown_to_html
-                from services.resend_client import send_email
-                html = markdown_to_html(d.get("draft_text", ""))
-                try:
-                    send_email(to_email=user.get("email"), subject="Your CreatorPulse Draft", html_content=html)
-                    st.success("Email sent.")
-                except Exception as e:
-                    st.error(f"Send failed: {e}")
+    # Form so the search only runs on submit, not on every keystroke
+    with st.form("search_drafts"):
+        q = st.text_input("Search drafts", key="drafts_search")
+        st.form_submit_button("Search")
+    # Normalised so "foo" and "foo " share one cache entry and query
+    drafts = cached_list_drafts(user["id"], 20, (q or "").strip())
+    if not drafts:
+        st.caption("No drafts found.")
+        return
+
+    # One table and a single picker instead of an expander and button per draft
+    st.dataframe(
+        [
+            {"Created": d["created_at"], "Status": "✅ sent" if d.get("sent") else "📝 draft", "Feedback": d.get("feedback") or ""}
+            for d in drafts
+        ],
+        use_container_width=True,
+        hide_index=True,
+    )
+    labels_by_id = {d["id"]: f"{d['created_at']} — {'✅ sent' if d.get('sent') else '📝 draft'}" for d in drafts}
+    selected_id = st.selectbox("Open a past draft", options=list(labels_by_id), format_func=labels_by_id.__getitem__, index=None, placeholder="Choose a draft")
+    if selected_id is None:
+        return
+
+    # Draft bodies are only fetched and rendered once picked
+    body = get_draft_body(selected_id)
+    st.markdown(body.get("draft_text") or "")
+    if st.button("Resend this draft"):
+        html = body.get("draft_html") or markdown_to_html(body.get("draft_text") or "")
+        try:
+            send_email(to_email=user.get("email"), subject="Your CreatorPulse Draft", html_content=html)
+            st.success("Email sent.")
+        except Exception as e:
+            st.error(f"Send failed: {e}")
+
+
+def render():
+    st.set_page_config(page_title="Dashboard — CreatorPulse", page_icon="📊", layout="wide")
+    inject_global_css()
+    user, current_workspace, user_role = auth_guard()
+
+    workspace_name = current_workspace["workspaces"]["name"]
+    workspace_id = current_workspace["workspace_id"]
+    
+    header("Dashboard", f"Generate your curated newsletter draft and send via email. Workspace: {workspace_name} ({user_role})")
+
+    # Quick Stats Row
+    bootstrap = st.session_state.get("dashboard_bootstrap", {}).pop((user["id"], workspace_id), None)
+    if bootstrap:
+        items = bootstrap["items"]
+        drafts = bootstrap["drafts"]
+        latest_draft = bootstrap["latest_draft"]
+    else:
+        items = cached_list_recent_content(user["id"], workspace_id, 50)
+        drafts = cached_list_drafts(user["id"], 10)
+        latest_draft = None
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        metric_card(str(len(items)), "Content Items", "📰")
+    with col2:
+        metric_card(str(len(drafts)), "Drafts Created", "📝")
+    with col3:
+        sent_drafts = len([d for d in drafts if d.get("sent_at")])
+        metric_card(str(sent_drafts), "Newsletters Sent", "📧")
+    with col4:
+        metric_card(f"{len(items)/5:.1f}", "Avg Items/Day", "📊")
+
+    st.divider()
+
+    with st.sidebar:
+        _sidebar_controls()
+
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        section_header("📥 Fetch and Select Content", "Get fresh content from your sources")
+        
+        # Fetch button with better styling
+        fetch_col1, fetch_col2 = st.columns([1, 3])
+        with fetch_col1:
+            fetch_future = st.session_state.get("_fetch_future")
+            if fetch_future is None:
+                if st.button("🔄 Fetch Content", type="primary", use_container_width=True):
+                    # Run the fetch off the script thread so the page stays responsive
+                    st.session_state["_fetch_future"] = _fetch_executor().submit(
+                        fetch_all_sources, user_id=user["id"], workspace_id=workspace_id
+                    )
+                    st.rerun()
+                _show_fetch_result()
+            else:
+                _fetch_progress(user["id"], workspace_id)
+        
+        with fetch_col2:
+            items = cached_list_recent_content(user["id"], workspace_id, 50)
+            if items:
+                progress_bar(len(items), 50, f"Content Items Available")
+            else:
+                empty_state("📭", "No Content Yet", "Fetch content from your sources to get started", "Fetch Content")
+
+        if items:
+            st.markdown("**Sort by:**")
+            metric = st.radio("Pick top by", ["Recency", "Title length", "Random"], horizontal=True, label_visibility="collapsed")
+            
+            items = _ordered_items(items, metric, user["id"], workspace_id)
+            
+            # Precompute labels so format_func is a dict read instead of a scan per option
+            labels_by_id = {it["id"]: f"{it['title'][:50]}... - {it['url'][:30]}..." for it in items}
+            selected_ids = st.multiselect(
+                "Select items to include",
+                options=list(labels_by_id),
+                format_func=labels_by_id.__getitem__,
+            )
+        else:
+            selected_ids = []
+
+    with col2:
+        _generate_panel(user["id"], selected_ids)
+
+    st.divider()
+    _latest_draft_fragment(user, workspace_id, latest_draft)
+
+    st.divider()
+    _past_drafts_fragment(user)
 
 if __name__ == "__main__":
     render()
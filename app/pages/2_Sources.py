@@ -1,9 +1,9 @@
 import streamlit as st
-from utils.ui import inject_global_css, header
+from utils.ui import inject_global_css, header, show_flash
 
 from services.supabase_client import (
-    get_current_user,
-    list_sources,
+    get_session_user,
+    cached_list_sources,
     add_source,
     remove_source,
     update_source_boost,
@@ -11,35 +11,57 @@ from services.supabase_client import (
 
 
 def auth_guard():
-    user = get_current_user()
+    user = get_session_user()
     if not user:
         st.error("Please login from the main page.")
         st.stop()
     return user
 
 
-def render():
-    st.set_page_config(page_title="Sources — CreatorPulse", page_icon="🔗", layout="wide")
-    inject_global_css()
-    user = auth_guard()
-    header("Sources", "Manage your Twitter handles, YouTube channels, and RSS feeds")
+# Source changes run as callbacks and only invalidate the cached source list,
+# so the rerun Streamlit already does shows the change without an extra st.rerun()
+def _add_source(user_id):
+    source_value = st.session_state["new_source_value"]
+    if not source_value:
+        return
+    try:
+        add_source(
+            user_id=user_id,
+            source_type=st.session_state["new_source_type"],
+            source_value=source_value,
+            boost_factor=st.session_state["new_source_boost"],
+        )
+        cached_list_sources.clear(user_id)
+        st.session_state["_add_flash"] = ("success", "Source added.")
+    except Exception as e:
+        st.session_state["_add_flash"] = ("error", f"Add failed: {e}")
+
+
+def _update_boost(user_id, source_id):
+    new_boost = st.session_state[f"boost_{source_id}"]
+    try:
+        update_source_boost(source_id=source_id, boost_factor=new_boost)
+        cached_list_sources.clear(user_id)
+        st.session_state["_list_flash"] = ("success", f"Updated boost to {new_boost}x")
+    except Exception as e:
+        st.session_state["_list_flash"] = ("error", f"Update failed: {e}")
+
+
+def _remove_source(user_id, source_id):
+    try:
+        remove_source(source_id)
+        cached_list_sources.clear(user_id)
+        st.session_state["_list_flash"] = ("success", "Removed.")
+    except Exception as e:
+        st.session_state["_list_flash"] = ("error", f"Remove failed: {e}")
 
-    with st.form("add_source_form"):
-        source_type = st.selectbox("Source type", ["twitter", "youtube", "rss"])
-        source_value = st.text_input("Handle / Channel URL / Feed URL")
-        boost_factor = st.slider("Boost factor", min_value=0.1, max_value=3.0, value=1.0, step=0.1, 
-                                help="Higher values make content from this source more likely to appear in newsletters")
-        submitted = st.form_submit_button("Add source")
-    if submitted and source_value:
-        try:
-            add_source(user_id=user["id"], source_type=source_type, source_value=source_value, boost_factor=boost_factor)
-            st.success("Source added.")
-            st.rerun()
-        except Exception as e:
-            st.error(f"Add failed: {e}")
 
+@st.fragment
+def _sources_list(user_id):
+    # Boost and remove interactions only rerun this section
     st.subheader("Your sources")
-    sources = list_sources(user_id=user["id"]) or []
+    show_flash("_list_flash")
+    sources = cached_list_sources(user_id) or []
     if not sources:
         st.info("No sources added yet. Add some Twitter handles, YouTube channels, or RSS feeds to get started!")
     else:
@@ -54,24 +76,28 @@ def render():
             cols[1].write(f"⚡ Boost: {current_boost}x")
             
             # Boost control
-            new_boost = cols[2].slider("Adjust", min_value=0.1, max_value=3.0, value=current_boost, 
-                                       step=0.1, key=f"boost_{s['id']}")
-            if new_boost != current_boost:
-                try:
-                    update_source_boost(source_id=s["id"], boost_factor=new_boost)
-                    st.success(f"Updated boost to {new_boost}x")
-                    st.rerun()
-                except Exception as e:
-                    st.error(f"Update failed: {e}")
+            cols[2].slider("Adjust", min_value=0.1, max_value=3.0, value=current_boost, 
+                           step=0.1, key=f"boost_{s['id']}", on_change=_update_boost, args=(user_id, s["id"]))
             
             # Remove button
-            if cols[3].button("🗑️ Remove", key=f"rm_{s['id']}"):
-                try:
-                    remove_source(s["id"]) 
-                    st.success("Removed.")
-                    st.rerun()
-                except Exception as e:
-                    st.error(f"Remove failed: {e}")
+            cols[3].button("🗑️ Remove", key=f"rm_{s['id']}", on_click=_remove_source, args=(user_id, s["id"]))
+
+
+def render():
+    st.set_page_config(page_title="Sources — CreatorPulse", page_icon="🔗", layout="wide")
+    inject_global_css()
+    user = auth_guard()
+    header("Sources", "Manage your Twitter handles, YouTube channels, and RSS feeds")
+
+    with st.form("add_source_form"):
+        st.selectbox("Source type", ["twitter", "youtube", "rss"], key="new_source_type")
+        st.text_input("Handle / Channel URL / Feed URL", key="new_source_value")
+        st.slider("Boost factor", min_value=0.1, max_value=3.0, value=1.0, step=0.1, key="new_source_boost",
+                  help="Higher values make content from this source more likely to appear in newsletters")
+        st.form_submit_button("Add source", on_click=_add_source, args=(user["id"],))
+    show_flash("_add_flash")
+
+    _sources_list(user["id"])
 
 
 if __name__ == "__main__":
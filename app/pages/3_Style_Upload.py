@@ -1,12 +1,16 @@
 import io
 import streamlit as st
-from utils.ui import inject_global_css, header, section_header
+from utils.ui import inject_global_css, header, section_header, show_flash
 
-from services.supabase_client import get_current_user, upload_style_file, list_style_files, delete_style_file
+from services.supabase_client import get_session_user, upload_style_files, cached_list_style_files, delete_style_file
+
+
+# Style samples are plain text; anything bigger is almost certainly the wrong file
+_MAX_STYLE_FILE_MB = 2
 
 
 def auth_guard():
-    user = get_current_user()
+    user = get_session_user()
     if not user:
         st.error("Please login from the main page.")
         st.stop()
@@ -22,9 +26,7 @@ def _count_samples_in_files(files):
             content = file_obj.get("content", "")
             if content:
                 # Count lines that look like newsletter samples (non-empty, reasonable length)
-                lines = [line.strip() for line in content.split('\n') if line.strip()]
-                samples = [line for line in lines if len(line) > 50]  # Reasonable sample length
-                total_samples += len(samples)
+                total_samples += sum(len(line.strip()) > 50 for line in content.split('\n'))
         except:
             # If we can't read content, estimate based on file size
             file_size = file_obj.get("size", 0)
@@ -33,6 +35,41 @@ def _count_samples_in_files(files):
     return total_samples
 
 
+@st.cache_data(show_spinner=False)
+def _cached_sample_count(user_id, file_key, _files):
+    # Keyed on the user and each file's (name, size); the contents in _files are not hashed
+    return _count_samples_in_files(_files)
+
+
+# Uploads and deletes run as callbacks, before the page re-reads the file list,
+# so the progress meter is current without an extra st.rerun()
+def _upload_files(user_id):
+    uploaded = st.session_state.get("style_uploads") or []
+    if not uploaded:
+        return
+    # Rejected on the size Streamlit already knows, before anything is sent to storage
+    too_large = [f for f in uploaded if f.size > _MAX_STYLE_FILE_MB * 1024 * 1024]
+    accepted = [f for f in uploaded if f not in too_large]
+    # Uploads are already in memory, so send their bytes; all files go up concurrently
+    errors = upload_style_files(user_id=user_id, files=[(f.name, f.getvalue()) for f in accepted]) if accepted else []
+    cached_list_style_files.clear(user_id)
+    st.session_state["_upload_flash"] = [
+        ("error", f"{f.name} is larger than {_MAX_STYLE_FILE_MB} MB and was not uploaded") for f in too_large
+    ] + [
+        ("success", f"Uploaded {f.name}") if error is None else ("error", f"Upload failed for {f.name}: {error}")
+        for f, error in zip(accepted, errors)
+    ]
+
+
+def _delete_file(user_id, filename):
+    try:
+        delete_style_file(user_id=user_id, filename=filename)
+        cached_list_style_files.clear(user_id)
+        st.session_state["_delete_flash"] = [("success", "Deleted.")]
+    except Exception as e:
+        st.session_state["_delete_flash"] = [("error", f"Delete failed: {e}")]
+
+
 def render():
     st.set_page_config(page_title="Style Upload — CreatorPulse", page_icon="📝", layout="wide")
     inject_global_css()
@@ -40,8 +77,8 @@ def render():
     header("Style Upload", "Upload .txt or .csv of past newsletters. Used to match your writing style.")
 
     # Get current files and show progress
-    files = list_style_files(user_id=user["id"]) or []
-    total_samples = _count_samples_in_files(files)
+    files = cached_list_style_files(user["id"])
+    total_samples = _cached_sample_count(user["id"], tuple((f.get("name"), f.get("size")) for f in files), files)
     
     # Progress meter
     section_header("Style Training Progress")
@@ -66,19 +103,14 @@ def render():
 
     # Upload section
     section_header("Upload New Samples")
-    uploaded = st.file_uploader("Upload style samples (.txt or .csv)", type=["txt", "csv"], accept_multiple_files=True)
-    if uploaded:
-        for f in uploaded:
-            data = f.read()
-            try:
-                upload_style_file(user_id=user["id"], filename=f.name, data=data)
-                st.success(f"Uploaded {f.name}")
-            except Exception as e:
-                st.error(f"Upload failed for {f.name}: {e}")
-        st.rerun()  # Refresh to update progress
+    with st.form("style_upload_form", clear_on_submit=True):
+        st.file_uploader("Upload style samples (.txt or .csv)", type=["txt", "csv"], accept_multiple_files=True, key="style_uploads", help=f"Up to {_MAX_STYLE_FILE_MB} MB per file")
+        st.form_submit_button("Upload", on_click=_upload_files, args=(user["id"],))
+    show_flash("_upload_flash")
 
     # File management section
     section_header("Your Style Files")
+    show_flash("_delete_flash")
     if not files:
         st.info("No style files uploaded yet. Upload some newsletter samples to get started!")
     else:
@@ -90,13 +122,7 @@ def render():
             file_size = obj.get('size', 0)
             cols[1].write(f"{file_size:,} bytes")
             
-            if cols[2].button("🗑️ Delete", key=f"del_{obj.get('name')}"):
-                try:
-                    delete_style_file(user_id=user["id"], filename=obj.get("name"))
-                    st.success("Deleted.")
-                    st.rerun()
-                except Exception as e:
-                    st.error(f"Delete failed: {e}")
+            cols[2].button("🗑️ Delete", key=f"del_{obj.get('name')}", on_click=_delete_file, args=(user["id"], obj.get("name")))
 
 
 if __name__ == "__main__":
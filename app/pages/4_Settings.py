@@ -1,13 +1,37 @@
+import time
+
 import streamlit as st
 from utils.ui import inject_global_css, header, section_header
-from datetime import datetime
+from datetime import datetime, timedelta
 import pytz
 
-from services.supabase_client import get_current_user, get_user_profile, update_user_profile
+from services.supabase_client import get_session_user, get_user_profile, update_user_profile
+
+
+_DAY_MAP = {"Mon": 0, "Tue": 1, "Wed": 2, "Thu": 3, "Fri": 4, "Sat": 5, "Sun": 6}
+
+
+def _tz_region(name):
+    return name.split("/", 1)[0] if "/" in name else "Other"
+
+
+# Zones grouped by region for the two-step picker, so each rerun ships one region's
+# zones to the browser instead of all ~600; positions are precomputed for the index lookups
+_TZ_TREE = {}
+for _name in pytz.all_timezones:
+    _TZ_TREE.setdefault(_tz_region(_name), []).append(_name)
+_TZ_REGIONS = sorted(_TZ_TREE)
+_TZ_REGION_INDEX = {region: i for i, region in enumerate(_TZ_REGIONS)}
+_TZ_INDEX = {name: i for zones in _TZ_TREE.values() for i, name in enumerate(zones)}
+
+
+@st.cache_resource(show_spinner=False)
+def _tz(name):
+    return pytz.timezone(name)
 
 
 def auth_guard():
-    user = get_current_user()
+    user = get_session_user()
     if not user:
         st.error("Please login from the main page.")
         st.stop()
@@ -20,7 +44,10 @@ def render():
     user = auth_guard()
     header("Settings", "Manage your profile and newsletter delivery preferences")
 
-    profile = get_user_profile(user_id=user["id"]) or {}
+    # Kept in session state until a save, so reruns and revisits skip the profile query
+    if "_profile" not in st.session_state:
+        st.session_state["_profile"] = get_user_profile(user_id=user["id"]) or {}
+    profile = st.session_state["_profile"]
     
     # Ensure profile has default values to prevent None errors
     if not profile:
@@ -35,6 +62,15 @@ def render():
     
     # Profile section
     section_header("Profile Information")
+    # Safe timezone selection; the region sits outside the form so changing it refreshes the zone list
+    user_timezone = profile.get("timezone") or "UTC"
+    if user_timezone not in _TZ_INDEX:
+        user_timezone = "UTC"
+    region = st.selectbox(
+        "Timezone region",
+        options=_TZ_REGIONS,
+        index=_TZ_REGION_INDEX[_tz_region(user_timezone)],
+    )
     with st.form("profile_form"):
         col1, col2 = st.columns(2)
         with col1:
@@ -42,17 +78,12 @@ def render():
         with col2:
             email = st.text_input("Email", value=profile.get("email", ""), help="Email address for receiving newsletters")
         
-        # Safe timezone selection
-        user_timezone = profile.get("timezone", "UTC")
-        try:
-            timezone_index = pytz.all_timezones.index(user_timezone)
-        except ValueError:
-            timezone_index = pytz.all_timezones.index("UTC")
-        
         timezone = st.selectbox(
             "Timezone", 
-            options=pytz.all_timezones,
-            index=timezone_index,
+            options=_TZ_TREE[region],
+            index=_TZ_INDEX[user_timezone] if _tz_region(user_timezone) == region else 0,
+            format_func=lambda name: name.split("/", 1)[-1].replace("_", " "),
+            key=f"timezone_{region}",
             help="Used for scheduling newsletter delivery"
         )
         
@@ -61,8 +92,8 @@ def render():
     if profile_submitted:
         try:
             update_user_profile(user_id=user["id"], name=name, email=email, timezone=timezone)
+            st.session_state.pop("_profile", None)
             st.success("✅ Profile saved successfully!")
-            st.rerun()
         except Exception as e:
             st.error(f"❌ Save failed: {e}")
 
@@ -109,9 +140,7 @@ def render():
             # Show next delivery preview
             if send_days and send_time_local:
                 try:
-                    user_tz = pytz.timezone(timezone)
-                    now = datetime.now(user_tz)
-                    next_delivery = _calculate_next_delivery(now, send_days, send_time_local, user_tz)
+                    next_delivery = _next_delivery_preview(tuple(send_days), send_time_local, timezone, int(time.time() // 60))
                     st.info(f"📬 Next delivery: {next_delivery.strftime('%A, %B %d at %I:%M %p')}")
                 except:
                     st.info("📬 Next delivery will be calculated after saving")
@@ -126,32 +155,31 @@ def render():
                 send_days=send_days, 
                 frequency=frequency
             )
+            st.session_state.pop("_profile", None)
             st.success("✅ Delivery preferences saved successfully!")
-            st.rerun()
         except Exception as e:
             st.error(f"❌ Save failed: {e}")
 
 
+@st.cache_data(ttl=60, show_spinner=False)
+def _next_delivery_preview(send_days, send_time, tz_name, minute_bucket):
+    # minute_bucket only keys the cache, so the preview is recomputed at most once a minute per input
+    user_tz = _tz(tz_name)
+    return _calculate_next_delivery(datetime.now(user_tz), list(send_days), send_time, user_tz)
+
+
 def _calculate_next_delivery(now, send_days, send_time, timezone):
     """Calculate the next delivery time based on preferences"""
-    import datetime as dt
-    
-    # Map day names to numbers
-    day_map = {"Mon": 0, "Tue": 1, "Wed": 2, "Thu": 3, "Fri": 4, "Sat": 5, "Sun": 6}
-    send_day_nums = [day_map[day] for day in send_days]
-    
-    # Find next occurrence
-    for i in range(7):  # Check next 7 days
-        check_date = now.date() + dt.timedelta(days=i)
-        if check_date.weekday() in send_day_nums:
-            delivery_datetime = dt.datetime.combine(check_date, send_time)
-            delivery_datetime = timezone.localize(delivery_datetime)
-            if delivery_datetime > now:
-                return delivery_datetime
+    if not send_days:
+        return now + timedelta(days=7)
     
-    # Fallback to next week
-    next_week = now + dt.timedelta(days=7)
-    return next_week
+    # Days ahead of each selected weekday; the nearest one plus a week covers a send time already passed today
+    offsets = sorted({(_DAY_MAP[day] - now.weekday()) % 7 for day in send_days})
+    for offset in (offsets[0], offsets[1] if len(offsets) > 1 else offsets[0] + 7):
+        delivery_datetime = timezone.localize(datetime.combine(now.date() + timedelta(days=offset), send_time))
+        if delivery_datetime > now:
+            return delivery_datetime
+    return delivery_datetime
 
 
 if __name__ == "__main__":
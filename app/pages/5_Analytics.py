@@ -1,10 +1,10 @@
 import streamlit as st
 from utils.ui import inject_global_css, header
-from services.supabase_client import get_current_user, get_email_analytics
+from services.supabase_client import get_session_user, cached_email_analytics
 
 
 def auth_guard():
-    user = get_current_user()
+    user = get_session_user()
     if not user:
         st.error("Please login from the main page.")
         st.stop()
@@ -19,7 +19,7 @@ def render():
     header("Analytics", "Email opens, clicks, and engagement metrics")
     
     days = st.selectbox("Time period", [7, 30, 90], index=1)
-    analytics = get_email_analytics(user_id=user["id"], days=days)
+    analytics = cached_email_analytics(user["id"], days)
     
     col1, col2, col3, col4 = st.columns(4)
     with col1:
@@ -33,9 +33,9 @@ def render():
     
     st.divider()
     
-    if analytics["clicks_by_url"]:
+    if analytics["top_clicks"]:
         st.subheader("Top Clicked Links")
-        for url, count in sorted(analytics["clicks_by_url"].items(), key=lambda x: x[1], reverse=True)[:10]:
+        for url, count in analytics["top_clicks"]:
             st.write(f"**{count} clicks:** [{url}]({url})")
     else:
         st.info("No clicks recorded yet. Send some emails to see analytics.")
@@ -3,21 +3,30 @@ from utils.ui import inject_global_css, header, section_header
 import re
 
 from services.supabase_client import (
-    get_current_user,
+    get_session_user,
     create_workspace,
-    get_user_workspaces,
+    cached_user_workspaces,
     get_workspace_members,
+    cached_workspace_member_count,
     invite_user_to_workspace,
     update_workspace_member_role,
     remove_workspace_member,
     get_user_workspace_role,
-    get_user_plan_limits,
+    cached_user_plan_limits,
     check_usage_limit,
 )
 
 
+_MEMBERS_PAGE_SIZE = 25
+_SLUG_STRIP = re.compile(r'[^\w\s-]')
+_SLUG_DASH = re.compile(r'[-\s]+')
+_ROLES = ("viewer", "editor", "admin")
+_ROLE_IDX = {r: i for i, r in enumerate(_ROLES)}
+_MANAGER_ROLES = ("owner", "admin")
+
+
 def auth_guard():
-    user = get_current_user()
+    user = get_session_user()
     if not user:
         st.error("Please login from the main page.")
         st.stop()
@@ -26,9 +35,117 @@ def auth_guard():
 
 def _slugify(text: str) -> str:
     """Convert text to URL-friendly slug"""
-    slug = re.sub(r'[^\w\s-]', '', text.lower())
-    slug = re.sub(r'[-\s]+', '-', slug)
-    return slug.strip('-')
+    return _SLUG_DASH.sub('-', _SLUG_STRIP.sub('', text.lower())).strip('-')
+
+
+def _shift_members_page(slug: str, delta: int):
+    key = f"members_offset_{slug}"
+    st.session_state[key] = max(0, st.session_state.get(key, 0) + delta)
+
+
+@st.fragment
+def _members_fragment(workspace_data: dict, user: dict, role: str):
+    """Manage Members panel; its widgets rerun only this fragment, not the whole page"""
+    workspace = workspace_data["workspaces"]
+    st.markdown("---")
+    st.markdown("#### 👥 Manage Members")
+
+    # Get one page of workspace members
+    offset_key = f"members_offset_{workspace['slug']}"
+    offset = st.session_state.get(offset_key, 0)
+    members = get_workspace_members(
+        workspace_id=workspace_data["workspace_id"],
+        limit=_MEMBERS_PAGE_SIZE,
+        offset=offset,
+    )
+    total_members = cached_workspace_member_count(workspace_data["workspace_id"])
+
+    # Invite new member
+    with st.form(f"invite_form_{workspace['slug']}"):
+        col1, col2, col3 = st.columns([2, 1, 1])
+
+        with col1:
+            invite_email = st.text_input("Email", placeholder="user@example.com", key=f"email_{workspace['slug']}")
+        with col2:
+            invite_role = st.selectbox("Role", _ROLES, key=f"role_{workspace['slug']}")
+        with col3:
+            invite_submitted = st.form_submit_button("📧 Invite")
+
+    if invite_submitted and invite_email:
+        try:
+            invite_user_to_workspace(
+                workspace_id=workspace_data["workspace_id"],
+                email=invite_email,
+                role=invite_role,
+                invited_by=user["id"]
+            )
+            cached_workspace_member_count.clear(workspace_data["workspace_id"])
+            st.success(f"✅ Invited {invite_email} as {invite_role}")
+            st.rerun(scope="fragment")
+        except Exception as e:
+            st.error(f"❌ Failed to invite user: {e}")
+
+    # List existing members
+    st.markdown("**Current Members:**")
+    for member in members:
+        member_cols = st.columns([2, 1, 1, 1])
+
+        with member_cols[0]:
+            user_info = member.get("users", {})
+            status = "✅ Joined" if member.get("joined_at") else "📧 Pending"
+            st.write(f"**{user_info.get('name', 'Unknown')}** ({user_info.get('email', 'No email')}) - {status}")
+
+        with member_cols[1]:
+            st.write(f"Role: {member['role'].title()}")
+
+        with member_cols[2]:
+            if role in _MANAGER_ROLES and member["role"] != "owner":
+                new_role = st.selectbox(
+                    "Change role",
+                    _ROLES,
+                    index=_ROLE_IDX.get(member["role"], 0),
+                    key=f"role_change_{member['id']}"
+                )
+                if new_role != member["role"]:
+                    try:
+                        update_workspace_member_role(member_id=member["id"], role=new_role)
+                        st.success(f"✅ Updated role to {new_role}")
+                        st.rerun(scope="fragment")
+                    except Exception as e:
+                        st.error(f"❌ Failed to update role: {e}")
+
+        with member_cols[3]:
+            if role == "owner" and member["role"] != "owner":
+                if st.button("🗑️ Remove", key=f"remove_{member['id']}"):
+                    try:
+                        remove_workspace_member(member_id=member["id"])
+                        cached_workspace_member_count.clear(workspace_data["workspace_id"])
+                        st.success("✅ Member removed")
+                        st.rerun(scope="fragment")
+                    except Exception as e:
+                        st.error(f"❌ Failed to remove member: {e}")
+
+    if total_members > _MEMBERS_PAGE_SIZE:
+        pager_cols = st.columns([1, 2, 1])
+        with pager_cols[0]:
+            st.button(
+                "← Prev",
+                key=f"members_prev_{workspace['slug']}",
+                disabled=offset == 0,
+                on_click=_shift_members_page,
+                args=(workspace["slug"], -_MEMBERS_PAGE_SIZE),
+            )
+        with pager_cols[1]:
+            last = min(offset + _MEMBERS_PAGE_SIZE, total_members)
+            st.caption(f"Showing {offset + 1}–{last} of {total_members}")
+        with pager_cols[2]:
+            st.button(
+                "Next →",
+                key=f"members_next_{workspace['slug']}",
+                disabled=offset + _MEMBERS_PAGE_SIZE >= total_members,
+                on_click=_shift_members_page,
+                args=(workspace["slug"], _MEMBERS_PAGE_SIZE),
+            )
 
 
 def render():
@@ -38,7 +155,7 @@ def render():
     header("Workspaces", "Create and manage team workspaces for collaborative newsletter creation")
 
     # Get user's workspaces
-    workspaces = get_user_workspaces(user_id=user["id"])
+    workspaces = cached_user_workspaces(user["id"])
     
     # Create new workspace section
     section_header("Create New Workspace")
@@ -62,8 +179,8 @@ def render():
     if create_submitted and workspace_name and workspace_slug:
         try:
             # Check workspace limit
-            limits = get_user_plan_limits(user_id=user["id"])
-            current_workspaces = len(get_user_workspaces(user_id=user["id"]))
+            limits = cached_user_plan_limits(user["id"])
+            current_workspaces = len(workspaces)
             max_workspaces = limits.get("max_workspaces", 1)
             
             if current_workspaces >= max_workspaces:
@@ -76,8 +193,19 @@ def render():
                 description=workspace_description,
                 owner_id=user["id"]
             )
+            cached_user_workspaces.clear(user["id"])
+            # Show the new workspace in the list below without rerunning the page
+            workspaces.append({
+                "workspace_id": workspace["id"],
+                "role": "owner",
+                "workspaces": {
+                    "name": workspace["name"],
+                    "slug": workspace["slug"],
+                    "description": workspace.get("description"),
+                    "created_at": workspace.get("created_at") or "",
+                },
+            })
             st.success(f"✅ Workspace '{workspace_name}' created successfully!")
-            st.rerun()
         except Exception as e:
             st.error(f"❌ Failed to create workspace: {e}")
 
@@ -92,7 +220,15 @@ def render():
             workspace = workspace_data["workspaces"]
             role = workspace_data["role"]
             
-            with st.expander(f"🏢 {workspace['name']} ({role.title()})"):
+            # Tracked expander: a collapsed workspace skips its body, so only open rows do any work
+            expander = st.expander(
+                f"🏢 {workspace['name']} ({role.title()})",
+                key=f"workspace_open_{workspace['slug']}",
+                on_change="rerun",
+            )
+            if not expander.open:
+                continue
+            with expander:
                 col1, col2 = st.columns([2, 1])
                 
                 with col1:
@@ -101,83 +237,16 @@ def render():
                     st.write(f"**Created:** {workspace['created_at'][:10]}")
                 
                 with col2:
-                    if role in ["owner", "admin"]:
+                    if role in _MANAGER_ROLES:
                         if st.button("👥 Manage Members", key=f"manage_{workspace['slug']}"):
-                            st.session_state[f"manage_workspace_{workspace['slug']}"] = True
+                            st.session_state.setdefault("managing", set()).add(workspace["slug"])
                     
                     if st.button("📊 View Analytics", key=f"analytics_{workspace['slug']}"):
                         st.info("Analytics coming soon!")
                 
-                # Member management section
-                if st.session_state.get(f"manage_workspace_{workspace['slug']}", False):
-                    st.markdown("---")
-                    st.markdown("#### 👥 Manage Members")
-                    
-                    # Get workspace members
-                    members = get_workspace_members(workspace_id=workspace_data["workspace_id"])
-                    
-                    # Invite new member
-                    with st.form(f"invite_form_{workspace['slug']}"):
-                        col1, col2, col3 = st.columns([2, 1, 1])
-                        
-                        with col1:
-                            invite_email = st.text_input("Email", placeholder="user@example.com", key=f"email_{workspace['slug']}")
-                        with col2:
-                            invite_role = st.selectbox("Role", ["viewer", "editor", "admin"], key=f"role_{workspace['slug']}")
-                        with col3:
-                            invite_submitted = st.form_submit_button("📧 Invite")
-                    
-                    if invite_submitted and invite_email:
-                        try:
-                            invite_user_to_workspace(
-                                workspace_id=workspace_data["workspace_id"],
-                                email=invite_email,
-                                role=invite_role,
-                                invited_by=user["id"]
-                            )
-                            st.success(f"✅ Invited {invite_email} as {invite_role}")
-                            st.rerun()
-                        except Exception as e:
-                            st.error(f"❌ Failed to invite user: {e}")
-                    
-                    # List existing members
-                    st.markdown("**Current Members:**")
-                    for member in members:
-                        member_cols = st.columns([2, 1, 1, 1])
-                        
-                        with member_cols[0]:
-                            user_info = member.get("users", {})
-                            status = "✅ Joined" if member.get("joined_at") else "📧 Pending"
-                            st.write(f"**{user_info.get('name', 'Unknown')}** ({user_info.get('email', 'No email')}) - {status}")
-                        
-                        with member_cols[1]:
-                            st.write(f"Role: {member['role'].title()}")
-                        
-                        with member_cols[2]:
-                            if role in ["owner", "admin"] and member["role"] != "owner":
-                                new_role = st.selectbox(
-                                    "Change role",
-                                    ["viewer", "editor", "admin"],
-                                    index=["viewer", "editor", "admin"].index(member["role"]),
-                                    key=f"role_change_{member['id']}"
-                                )
-                                if new_role != member["role"]:
-                                    try:
-                                        update_workspace_member_role(member_id=member["id"], role=new_role)
-                                        st.success(f"✅ Updated role to {new_role}")
-                                        st.rerun()
-                                    except Exception as e:
-                                        st.error(f"❌ Failed to update role: {e}")
-                        
-                        with member_cols[3]:
-                            if role == "owner" and member["role"] != "owner":
-                                if st.button("🗑️ Remove", key=f"remove_{member['id']}"):
-                                    try:
-                                        remove_workspace_member(member_id=member["id"])
-                                        st.success("✅ Member removed")
-                                        st.rerun()
-                                    except Exception as e:
-                                        st.error(f"❌ Failed to remove member: {e}")
+                # Member management section; only managers ever fetch the member list
+                if role in _MANAGER_ROLES and workspace["slug"] in st.session_state.get("managing", ()):
+                    _members_fragment(workspace_data, user, role)
 
 
 if __name__ == "__main__":
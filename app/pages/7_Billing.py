@@ -1,14 +1,18 @@
+from datetime import datetime
+from functools import lru_cache, partial
+
 import streamlit as st
 from utils.ui import inject_global_css, header, section_header
 from services.supabase_client import (
-    get_current_user,
+    gather_reads,
+    get_session_user,
     get_user_subscription,
-    get_subscription_plans,
-    get_user_plan_limits,
-    get_usage_for_period,
+    cached_subscription_plans,
+    cached_user_plan_limits,
+    cached_usage_summary,
     create_user_subscription,
-    get_user_workspaces,
-    list_sources,
+    get_stripe_customer_id,
+    save_stripe_customer_id,
 )
 from services.stripe_client import (
     create_customer,
@@ -21,27 +25,86 @@ from services.stripe_client import (
 
 
 def auth_guard():
-    user = get_current_user()
+    user = get_session_user()
     if not user:
         st.error("Please login from the main page.")
         st.stop()
     return user
 
 
+def _get_or_create_customer(user: dict, current_subscription: dict | None) -> str:
+    """Stripe customer id already stored for the user, or a new one saved onto their users row"""
+    if current_subscription and current_subscription.get("stripe_customer_id"):
+        return current_subscription["stripe_customer_id"]
+    customer_id = get_stripe_customer_id(user_id=user["id"])
+    if customer_id:
+        return customer_id
+    # Keyed by user so a double click before the save lands still yields one customer
+    customer = create_customer(
+        email=user["email"], name=user.get("name", ""), idempotency_key=f"customer-{user['id']}"
+    )
+    save_stripe_customer_id(user_id=user["id"], stripe_customer_id=customer.id)
+    return customer.id
+
+
+@lru_cache(maxsize=32)
+def _billing_date(period_end: str) -> str:
+    """Parse and format a period end timestamp once per distinct value"""
+    return datetime.fromisoformat(period_end.replace('Z', '+00:00')).strftime('%B %d, %Y')
+
+
+def _plan_row(plan: dict, is_current: bool) -> dict:
+    """One row of the plan comparison table"""
+    monthly_price = plan.get("price_monthly_cents", 0)
+    yearly_price = plan.get("price_yearly_cents")
+    features = plan.get("features", {})
+    limits_data = plan.get("limits", {})
+    
+    if monthly_price == 0:
+        price = "Free"
+    else:
+        price = f"{format_price(monthly_price)}/month"
+        if yearly_price:
+            savings = ((monthly_price * 12) - yearly_price) / (monthly_price * 12) * 100
+            price += f" · {format_price(yearly_price)}/year (Save {savings:.0f}%)"
+    
+    extras = [
+        label for key, label in (
+            ("analytics", "📊 Advanced analytics"),
+            ("priority_support", "🚀 Priority support"),
+            ("white_label", "🎨 White-label options"),
+        )
+        if features.get(key)
+    ]
+    return {
+        "Plan": ("✅ " + plan["name"] + " (Current)") if is_current else plan["name"],
+        "Price": price,
+        "Workspaces": limits_data.get("max_workspaces", 1),
+        "Team members / workspace": limits_data.get("max_team_members", 1),
+        "Sources": limits_data.get("max_sources", 5),
+        "Newsletters / month": limits_data.get("max_newsletters_per_month", 10),
+        "Extras": ", ".join(extras),
+    }
+
+
 def render():
     st.set_page_config(page_title="Billing — CreatorPulse", page_icon="💳", layout="wide")
     inject_global_css()
     user = auth_guard()
     
     header("Billing & Subscription", "Manage your subscription plan and billing")
+    base_url = st.get_option("browser.serverAddress") or "http://localhost:8501"
 
-    # Get current subscription
-    current_subscription = get_user_subscription(user_id=user["id"])
+    # Every read the page needs is independent, so issue them together before rendering;
+    # the usage counters themselves come back from a single RPC
+    current_subscription, plans, limits, usage = gather_reads(
+        partial(get_user_subscription, user_id=user["id"]),
+        cached_subscription_plans,
+        partial(cached_user_plan_limits, user["id"]),
+        partial(cached_usage_summary, user["id"], 30),
+    )
     current_plan_id = current_subscription.get("plan_id", "free") if current_subscription else "free"
     
-    # Get all available plans
-    plans = get_subscription_plans()
-    
     # Display current plan
     section_header("Current Plan")
     if current_subscription:
@@ -59,9 +122,7 @@ def render():
         
         # Show billing period
         if current_subscription.get("current_period_end"):
-            from datetime import datetime
-            period_end = datetime.fromisoformat(current_subscription["current_period_end"].replace('Z', '+00:00'))
-            st.info(f"📅 Next billing date: {period_end.strftime('%B %d, %Y')}")
+            st.info(f"📅 Next billing date: {_billing_date(current_subscription['current_period_end'])}")
         
         # Customer portal button
         if current_subscription.get("stripe_customer_id"):
@@ -69,7 +130,7 @@ def render():
                 try:
                     portal_session = create_portal_session(
                         customer_id=current_subscription["stripe_customer_id"],
-                        return_url=st.get_option("browser.serverAddress") or "http://localhost:8501"
+                        return_url=base_url
                     )
                     st.success("Redirecting to billing portal...")
                     st.markdown(f"[Open Billing Portal]({portal_session.url})")
@@ -82,27 +143,26 @@ def render():
     
     # Usage overview
     section_header("Usage This Month")
-    limits = get_user_plan_limits(user_id=user["id"])
+    newsletters_sent = usage["newsletters"]
+    api_calls = usage["api_calls"]
     
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        newsletters_sent = get_usage_for_period(user_id=user["id"], metric_type="newsletter_sent", days=30)
         max_newsletters = limits.get("max_newsletters_per_month", 10)
         st.metric("Newsletters Sent", f"{newsletters_sent}/{max_newsletters}")
     
     with col2:
-        workspaces_count = len(get_user_workspaces(user_id=user["id"]))
+        workspaces_count = usage["workspaces"]
         max_workspaces = limits.get("max_workspaces", 1)
         st.metric("Workspaces", f"{workspaces_count}/{max_workspaces}")
     
     with col3:
-        sources_count = len(list_sources(user_id=user["id"]))
+        sources_count = usage["sources"]
         max_sources = limits.get("max_sources", 5)
         st.metric("Sources", f"{sources_count}/{max_sources}")
     
     with col4:
-        api_calls = get_usage_for_period(user_id=user["id"], metric_type="api_call", days=30)
         st.metric("API Calls", api_calls)
     
     st.divider()
@@ -110,7 +170,13 @@ def render():
     # Available plans
     section_header("Available Plans")
     
-    # Create columns for plan cards
+    # One comparison table instead of a column of markdown calls per plan
+    st.dataframe(
+        [_plan_row(plan, plan["id"] == current_plan_id) for plan in plans],
+        use_container_width=True,
+        hide_index=True,
+    )
+    
     plan_cols = st.columns(len(plans))
     
     for i, plan in enumerate(plans):
@@ -118,64 +184,24 @@ def render():
             is_current_plan = plan["id"] == current_plan_id
             is_free_plan = plan["id"] == "free"
             
-            # Plan card styling
-            if is_current_plan:
-                st.markdown("### ✅ " + plan["name"] + " (Current)")
-            else:
-                st.markdown("### " + plan["name"])
-            
-            # Price
-            monthly_price = plan.get("price_monthly_cents", 0)
-            yearly_price = plan.get("price_yearly_cents")
-            
-            if monthly_price == 0:
-                st.markdown("**Free**")
-            else:
-                st.markdown(f"**{format_price(monthly_price)}/month**")
-                if yearly_price:
-                    savings = ((monthly_price * 12) - yearly_price) / (monthly_price * 12) * 100
-                    st.markdown(f"*{format_price(yearly_price)}/year (Save {savings:.0f}%)*")
-            
-            # Features
-            features = plan.get("features", {})
-            limits_data = plan.get("limits", {})
-            
-            st.markdown("**Features:**")
-            st.markdown(f"• {limits_data.get('max_workspaces', 1)} workspaces")
-            st.markdown(f"• {limits_data.get('max_team_members', 1)} team members per workspace")
-            st.markdown(f"• {limits_data.get('max_sources', 5)} content sources")
-            st.markdown(f"• {limits_data.get('max_newsletters_per_month', 10)} newsletters/month")
-            
-            if features.get("analytics"):
-                st.markdown("• 📊 Advanced analytics")
-            if features.get("priority_support"):
-                st.markdown("• 🚀 Priority support")
-            if features.get("white_label"):
-                st.markdown("• 🎨 White-label options")
-            
             # Action buttons
             if is_current_plan:
-                st.markdown("**✅ Current Plan**")
+                st.markdown(f"**✅ {plan['name']} — Current Plan**")
             elif is_free_plan:
-                st.markdown("**📝 Default Plan**")
+                st.markdown(f"**📝 {plan['name']} — Default Plan**")
             else:
                 # Subscribe button
                 if st.button(f"Subscribe to {plan['name']}", key=f"subscribe_{plan['id']}"):
                     try:
                         # Create Stripe customer if not exists
-                        customer_id = None
-                        if current_subscription and current_subscription.get("stripe_customer_id"):
-                            customer_id = current_subscription["stripe_customer_id"]
-                        else:
-                            customer = create_customer(email=user["email"], name=user.get("name", ""))
-                            customer_id = customer.id
+                        customer_id = _get_or_create_customer(user, current_subscription)
                         
                         # Create checkout session
                         checkout_session = create_checkout_session(
                             customer_id=customer_id,
                             price_id=plan.get("stripe_price_id_monthly", "price_test"),  # Use test price for now
-                            success_url=f"{st.get_option('browser.serverAddress') or 'http://localhost:8501'}/billing?success=true",
-                            cancel_url=f"{st.get_option('browser.serverAddress') or 'http://localhost:8501'}/billing?canceled=true"
+                            success_url=f"{base_url}/billing?success=true",
+                            cancel_url=f"{base_url}/billing?canceled=true"
                         )
                         
                         st.success("Redirecting to checkout...")
@@ -193,21 +219,20 @@ def render():
     # Usage alerts
     section_header("Usage Alerts")
     
-    # Check if approaching limits
-    newsletters_usage = newsletters_sent / max_newsletters
-    workspaces_usage = workspaces_count / max_workspaces
-    sources_usage = sources_count / max_sources
+    # Check if approaching limits; a zero limit counts as no usage rather than dividing by zero
+    usages = {
+        "monthly newsletter": (newsletters_sent, max_newsletters),
+        "workspace": (workspaces_count, max_workspaces),
+        "sources": (sources_count, max_sources),
+    }
+    ratios = {name: (used / limit if limit else 0) for name, (used, limit) in usages.items()}
     
-    if newsletters_usage > 0.8:
-        st.warning(f"⚠️ You've used {newsletters_usage:.0%} of your monthly newsletter limit")
-    if workspaces_usage > 0.8:
-        st.warning(f"⚠️ You've used {workspaces_usage:.0%} of your workspace limit")
-    if sources_usage > 0.8:
-        st.warning(f"⚠️ You've used {sources_usage:.0%} of your sources limit")
+    for name, ratio in ratios.items():
+        if ratio > 0.8:
+            st.warning(f"⚠️ You've used {ratio:.0%} of your {name} limit")
     
-    if newsletters_usage < 0.5 and workspaces_usage < 0.5 and sources_usage < 0.5:
+    if all(ratio < 0.5 for ratio in ratios.values()):
         st.success("✅ All usage within limits")
 
-
 if __name__ == "__main__":
     render()
@@ -1,28 +1,48 @@
+import math
+import time
+from datetime import datetime, timedelta, timezone
+
 import streamlit as st
 from utils.ui import inject_global_css, header, section_header
 from services.supabase_client import (
-    get_current_user,
+    get_session_user,
     get_user_workspace_role,
-    get_client_profiles,
+    cached_client_profiles,
     create_client_profile,
     update_client_profile,
     delete_client_profile,
     get_client_workspaces,
     create_client_workspace,
     get_bulk_operations,
-    get_workspace_analytics,
-    get_user_workspaces,
+    count_active_bulk_operations,
+    fail_stale_bulk_operations,
+    cached_bulk_operations,
+    cached_workspace_analytics,
+    cached_workspace_metrics_bulk,
+    cached_user_workspaces,
     create_workspace,
+    cached_user_plan_id,
 )
-from services.bulk_operations import (
-    run_bulk_fetch,
-    run_bulk_generate,
-    run_bulk_send,
-)
+
+
+_BULK_CLICK_COOLDOWN_SECONDS = 2
+_CLIENTS_PAGE_SIZE = 25
+_STATUS_EMOJI = {
+    "pending": "⏳",
+    "running": "🔄",
+    "completed": "✅",
+    "failed": "❌"
+}
+# Pending runs are waiting for a free background worker, which may be busy with another agency's run
+_STATUS_LABELS = {"pending": "Queued"}
+_ACTIVE_STATUSES = ("pending", "running")
+# A pending/running row older than this lost its runner (restart, crash) and no longer blocks new runs
+_BULK_STALE_MINUTES = 60
+_HISTORY_POLL_SECONDS = 5
 
 
 def auth_guard():
-    user = get_current_user()
+    user = get_session_user()
     if not user:
         st.error("Please login from the main page.")
         st.stop()
@@ -45,6 +65,403 @@ def auth_guard():
     return user, current_workspace, user_role
 
 
+def _clear_bulk_caches(workspace_id: str):
+    """Bulk runs add an operation and can change this workspace's counts; other workspaces keep their entries"""
+    cached_bulk_operations.clear(workspace_id, 5)
+    cached_bulk_operations.clear(workspace_id, 10)
+    cached_workspace_analytics.clear(workspace_id, 30)
+
+
+def _is_active(op: dict) -> bool:
+    """Pending or running and recent enough that a background worker can still own it"""
+    if op["status"] not in _ACTIVE_STATUSES:
+        return False
+    created_at = datetime.fromisoformat(op["created_at"].replace("Z", "+00:00"))
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return datetime.now(timezone.utc) - created_at < timedelta(minutes=_BULK_STALE_MINUTES)
+
+
+def _status_label(op: dict) -> str:
+    return _STATUS_LABELS.get(op["status"], op["status"].title())
+
+
+def _claim_bulk_run(workspace_id: str) -> bool:
+    """Allow a bulk run unless one was just clicked or the workspace still has one pending or running"""
+    now = time.time()
+    if now - st.session_state.get("bulk_last_click", 0) < _BULK_CLICK_COOLDOWN_SECONDS:
+        return False
+    st.session_state["bulk_last_click"] = now
+    # Runs finish on a background thread, so ask the database rather than trusting session state;
+    # rows abandoned by a restart are failed first so they cannot block the workspace forever
+    fail_stale_bulk_operations(workspace_id=workspace_id, stale_after_minutes=_BULK_STALE_MINUTES)
+    if count_active_bulk_operations(workspace_id=workspace_id, stale_after_minutes=_BULK_STALE_MINUTES):
+        st.warning("A bulk operation is still in progress for this workspace. Wait for it to finish.")
+        return False
+    return True
+
+
+@st.fragment
+def _client_list(workspace_id: str):
+    """Client List; expanding, editing or deleting a client reruns only this block"""
+    clients = cached_client_profiles(workspace_id)
+
+    if clients:
+        st.markdown("### Client List")
+        # Filter and page in Python over the cached list, so only one page of expanders is built
+        query = st.text_input("Filter clients", key="client_filter").strip().lower()
+        if query:
+            clients = [c for c in clients if query in c["client_name"].lower()]
+        page_count = max(1, math.ceil(len(clients) / _CLIENTS_PAGE_SIZE))
+        if st.session_state.get("client_page", 1) > page_count:
+            st.session_state["client_page"] = page_count
+        page = st.number_input("Page", min_value=1, max_value=page_count, key="client_page") if page_count > 1 else 1
+        start = (page - 1) * _CLIENTS_PAGE_SIZE
+        if not clients:
+            st.caption("No clients match the filter.")
+        for client in clients[start:start + _CLIENTS_PAGE_SIZE]:
+            # Tracked expander: collapsed clients skip their details, buttons and edit form
+            expander = st.expander(f"🏢 {client['client_name']}", key=f"client_open_{client['id']}", on_change="rerun")
+            if not expander.open:
+                continue
+            with expander:
+                col1, col2 = st.columns([3, 1])
+
+                with col1:
+                    # One markdown block per client rather than a write per field
+                    details = [
+                        f"**Email:** {client.get('client_email', 'Not provided')}",
+                        f"**Website:** {client.get('client_website', 'Not provided')}",
+                        f"**Industry:** {client.get('industry', 'Not specified')}",
+                        f"**Contact:** {client.get('contact_person', 'Not specified')}",
+                    ]
+                    if client.get('notes'):
+                        details.append(f"**Notes:** {client['notes']}")
+                    st.markdown("\n\n".join(details))
+
+                with col2:
+                    if st.button("Edit", key=f"edit_{client['id']}"):
+                        st.session_state[f"edit_client_{client['id']}"] = True
+
+                    if st.button("Delete", key=f"delete_{client['id']}"):
+                        try:
+                            delete_client_profile(client_id=client["id"])
+                            cached_client_profiles.clear(workspace_id)
+                            st.success("Client deleted")
+                            st.rerun(scope="fragment")
+                        except Exception as e:
+                            st.error(f"Failed to delete: {e}")
+
+                # Edit form
+                if st.session_state.get(f"edit_client_{client['id']}", False):
+                    st.markdown("---")
+                    with st.form(f"edit_form_{client['id']}"):
+                        new_name = st.text_input("Client Name", value=client["client_name"])
+                        new_email = st.text_input("Client Email", value=client.get("client_email", ""))
+                        new_website = st.text_input("Client Website", value=client.get("client_website", ""))
+                        new_industry = st.text_input("Industry", value=client.get("industry", ""))
+                        new_contact = st.text_input("Contact Person", value=client.get("contact_person", ""))
+                        new_notes = st.text_area("Notes", value=client.get("notes", ""))
+
+                        if st.form_submit_button("Update Client"):
+                            try:
+                                update_client_profile(
+                                    client_id=client["id"],
+                                    client_name=new_name,
+                                    client_email=new_email,
+                                    client_website=new_website,
+                                    industry=new_industry,
+                                    contact_person=new_contact,
+                                    notes=new_notes
+                                )
+                                cached_client_profiles.clear(workspace_id)
+                                st.success("Client updated!")
+                                st.session_state[f"edit_client_{client['id']}"] = False
+                                st.rerun(scope="fragment")
+                            except Exception as e:
+                                st.error(f"Failed to update: {e}")
+    else:
+        st.info("No clients yet. Add your first client above.")
+
+
+@st.fragment
+def _tab_overview(workspace_id: str):
+    """Overview tab: current workspace metrics and recent bulk operations"""
+    section_header("Agency Overview")
+
+    # Get analytics for current workspace
+    analytics = cached_workspace_analytics(workspace_id, 30)
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Newsletters Sent (30d)", int(analytics["newsletters_sent"]))
+    with col2:
+        st.metric("Active Sources", analytics["sources_count"])
+    with col3:
+        st.metric("Team Members", analytics["members_count"])
+    with col4:
+        st.metric("Drafts Created (30d)", analytics["drafts_count"])
+
+    st.divider()
+
+    # Recent bulk operations
+    section_header("Recent Bulk Operations")
+    bulk_ops = cached_bulk_operations(workspace_id, 5)
+
+    if bulk_ops:
+        for op in bulk_ops:
+            status_emoji = _STATUS_EMOJI.get(op["status"], "❓")
+
+            st.markdown(
+                f"{status_emoji} **{op['operation_type'].replace('_', ' ').title()}** - {_status_label(op)}  \n"
+                f":gray[Created by {op.get('users', {}).get('name', 'Unknown')} • {op['created_at'][:16]}]"
+            )
+    else:
+        st.info("No bulk operations yet. Create some in the Bulk Operations tab.")
+
+
+@st.fragment
+def _tab_clients(workspace_id: str):
+    """Client Management tab"""
+    section_header("Client Management")
+
+    # Create new client
+    with st.expander("➕ Add New Client"):
+        with st.form("add_client_form"):
+            col1, col2 = st.columns(2)
+
+            with col1:
+                client_name = st.text_input("Client Name", placeholder="Acme Corp")
+                client_email = st.text_input("Client Email", placeholder="contact@acme.com")
+                client_website = st.text_input("Client Website", placeholder="https://acme.com")
+
+            with col2:
+                industry = st.text_input("Industry", placeholder="Technology")
+                contact_person = st.text_input("Contact Person", placeholder="John Doe")
+                notes = st.text_area("Notes", placeholder="Client preferences, special requirements...")
+
+            submitted = st.form_submit_button("Add Client")
+
+            if submitted and client_name:
+                try:
+                    client = create_client_profile(
+                        workspace_id=workspace_id,
+                        client_name=client_name,
+                        client_email=client_email,
+                        client_website=client_website,
+                        industry=industry,
+                        contact_person=contact_person,
+                        notes=notes
+                    )
+                    cached_client_profiles.clear(workspace_id)
+                    st.success(f"✅ Client '{client_name}' added successfully!")
+                    st.rerun(scope="fragment")
+                except Exception as e:
+                    st.error(f"❌ Failed to add client: {e}")
+
+    # List existing clients
+    _client_list(workspace_id)
+
+
+def _render_operation_history(bulk_ops: list):
+    """One expander per operation with its progress, error and per-workspace results"""
+    for op in bulk_ops:
+        status_emoji = _STATUS_EMOJI.get(op["status"], "❓")
+
+        with st.expander(f"{status_emoji} {op['operation_type'].replace('_', ' ').title()} - {_status_label(op)}"):
+            col1, col2 = st.columns(2)
+
+            with col1:
+                st.markdown(
+                    f"**Created:** {op['created_at'][:16]}\n\n"
+                    f"**Created by:** {op.get('users', {}).get('name', 'Unknown')}\n\n"
+                    f"**Target workspaces:** {len(op['target_workspaces'])}"
+                )
+
+            with col2:
+                if op.get('progress'):
+                    progress = op['progress']
+                    progress_text = f"**Progress:** {progress.get('completed', 0)}/{progress.get('total', 0)} completed"
+                    if progress.get('failed', 0) > 0:
+                        progress_text += f"\n\n**Failed:** {progress['failed']}"
+                    st.markdown(progress_text)
+
+            if op["status"] == "pending":
+                st.caption("Queued: waiting for a free background worker.")
+
+            if op.get('error_message'):
+                st.error(f"Error: {op['error_message']}")
+
+            if op.get('results'):
+                st.json(op['results'])
+
+
+def _live_operation_history(workspace_id: str):
+    """Re-read history on a timer until every operation settles, then rerun once with fresh caches"""
+    bulk_ops = get_bulk_operations(workspace_id=workspace_id, limit=10)
+    _render_operation_history(bulk_ops)
+    if not any(_is_active(op) for op in bulk_ops):
+        _clear_bulk_caches(workspace_id)
+        st.rerun()
+
+
+@st.fragment
+def _tab_bulk(user: dict, workspace_id: str, all_workspaces: list):
+    """Bulk Operations tab; its multiselects and sliders rerun only this tab"""
+    # Imported here so users who stop at the plan gate never load the generator and email stack
+    from services.bulk_operations import start_bulk_fetch, start_bulk_generate, start_bulk_send
+
+    section_header("Bulk Operations")
+
+    workspace_options = {f"{w['workspaces']['name']} ({w['role']})": w["workspace_id"] for w in all_workspaces}
+
+    if not workspace_options:
+        st.info("No workspaces available for bulk operations.")
+        return
+
+    # Bulk operations run in the background; the buttons stay disabled until every run has settled
+    bulk_ops = cached_bulk_operations(workspace_id, 10)
+    bulk_running = any(_is_active(op) for op in bulk_ops)
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        st.markdown("#### 📥 Bulk Fetch Sources")
+        st.caption("Fetch content from all sources across selected workspaces")
+
+        selected_workspaces_fetch = st.multiselect(
+            "Select workspaces",
+            options=list(workspace_options.keys()),
+            key="bulk_fetch_workspaces"
+        )
+
+        if st.button("🚀 Run Bulk Fetch", key="bulk_fetch", disabled=bulk_running):
+            if not selected_workspaces_fetch:
+                st.warning("Please select at least one workspace.")
+            elif _claim_bulk_run(workspace_id):
+                target_workspaces = [workspace_options[w] for w in selected_workspaces_fetch]
+                try:
+                    start_bulk_fetch(
+                        workspace_id=workspace_id,
+                        target_workspaces=target_workspaces,
+                        created_by=user["id"]
+                    )
+                    _clear_bulk_caches(workspace_id)
+                    st.toast(f"🚀 Bulk fetch queued for {len(target_workspaces)} workspaces — progress shows in Operation History.")
+                except Exception as e:
+                    st.error(f"❌ Could not start bulk fetch: {e}")
+
+    with col2:
+        st.markdown("#### ✍️ Bulk Generate Drafts")
+        st.caption("Generate newsletter drafts for selected workspaces")
+
+        selected_workspaces_generate = st.multiselect(
+            "Select workspaces",
+            options=list(workspace_options.keys()),
+            key="bulk_generate_workspaces"
+        )
+
+        temp = st.slider("Creativity", 0.0, 1.0, 0.7, key="bulk_temp")
+        links = st.slider("Number of links", 3, 10, 5, key="bulk_links")
+
+        if st.button("🚀 Run Bulk Generate", key="bulk_generate", disabled=bulk_running):
+            if not selected_workspaces_generate:
+                st.warning("Please select at least one workspace.")
+            elif _claim_bulk_run(workspace_id):
+                target_workspaces = [workspace_options[w] for w in selected_workspaces_generate]
+                try:
+                    start_bulk_generate(
+                        workspace_id=workspace_id,
+                        target_workspaces=target_workspaces,
+                        created_by=user["id"],
+                        temperature=temp,
+                        num_links=links
+                    )
+                    _clear_bulk_caches(workspace_id)
+                    st.toast(f"🚀 Bulk generate queued for {len(target_workspaces)} workspaces — progress shows in Operation History.")
+                except Exception as e:
+                    st.error(f"❌ Could not start bulk generate: {e}")
+
+    with col3:
+        st.markdown("#### 📧 Bulk Send Newsletters")
+        st.caption("Send newsletter drafts to all selected workspaces")
+
+        selected_workspaces_send = st.multiselect(
+            "Select workspaces",
+            options=list(workspace_options.keys()),
+            key="bulk_send_workspaces"
+        )
+
+        if st.button("🚀 Run Bulk Send", key="bulk_send", disabled=bulk_running):
+            if not selected_workspaces_send:
+                st.warning("Please select at least one workspace.")
+            elif _claim_bulk_run(workspace_id):
+                target_workspaces = [workspace_options[w] for w in selected_workspaces_send]
+                try:
+                    start_bulk_send(
+                        workspace_id=workspace_id,
+                        target_workspaces=target_workspaces,
+                        created_by=user["id"]
+                    )
+                    _clear_bulk_caches(workspace_id)
+                    st.toast(f"🚀 Bulk send queued for {len(target_workspaces)} workspaces — progress shows in Operation History.")
+                except Exception as e:
+                    st.error(f"❌ Could not start bulk send: {e}")
+
+    st.divider()
+
+    # Recent bulk operations; while any are in flight the history refreshes itself
+    section_header("Operation History")
+    bulk_ops = cached_bulk_operations(workspace_id, 10)
+
+    if not bulk_ops:
+        st.info("No bulk operations yet.")
+    elif any(_is_active(op) for op in bulk_ops):
+        st.fragment(_live_operation_history, run_every=_HISTORY_POLL_SECONDS)(workspace_id)
+    else:
+        _render_operation_history(bulk_ops)
+
+
+@st.fragment
+def _tab_analytics(all_workspaces: list):
+    """Analytics tab: side-by-side comparison of every workspace"""
+    section_header("Analytics Dashboard")
+
+    # Workspace comparison
+    st.markdown("### Workspace Comparison")
+
+    # Aggregated server-side in an hourly materialized view: one read regardless of workspace count
+    analytics_by_id = cached_workspace_metrics_bulk(tuple(w["workspace_id"] for w in all_workspaces))
+    st.caption("Metrics refresh hourly, so they can trail the live numbers on the Overview tab by up to an hour.")
+    workspace_analytics = []
+    for workspace_data in all_workspaces:
+        ws_name = workspace_data["workspaces"]["name"]
+        analytics = analytics_by_id[workspace_data["workspace_id"]]
+        workspace_analytics.append({
+            "name": ws_name,
+            "newsletters": analytics["newsletters_sent"],
+            "sources": analytics["sources_count"],
+            "members": analytics["members_count"],
+            "drafts": analytics["drafts_count"]
+        })
+
+    if workspace_analytics:
+        import pandas as pd
+        import plotly.express as px
+        flat_df = pd.DataFrame(workspace_analytics)
+        st.dataframe(flat_df.set_index("name"), use_container_width=True)
+
+        # One grouped bar chart instead of a chart per metric; long form comes from the flat frame
+        st.markdown("#### Newsletters Sent (30 days) and Active Sources")
+        long_df = flat_df.melt(
+            id_vars="name", value_vars=["newsletters", "sources"], var_name="metric", value_name="count"
+        )
+        fig = px.bar(long_df, x="name", y="count", color="metric", barmode="group")
+        fig.update_layout(xaxis_title=None, yaxis_title=None, legend_title=None)
+        st.plotly_chart(fig, use_container_width=True, key="agency_comparison_bar")
+    else:
+        st.info("No workspace data available yet.")
+
+
 def render():
     st.set_page_config(page_title="Agency Dashboard — CreatorPulse", page_icon="🏢", layout="wide")
     inject_global_css()
@@ -56,9 +473,7 @@ def render():
     header("Agency Dashboard", f"Manage multiple clients and bulk operations. Workspace: {workspace_name} ({user_role})")
 
     # Check if user has Agency plan
-    from services.supabase_client import get_user_subscription
-    subscription = get_user_subscription(user_id=user["id"])
-    plan_id = subscription.get("plan_id", "free") if subscription else "free"
+    plan_id = cached_user_plan_id(user["id"])
     
     if plan_id != "agency":
         st.warning("🚀 **Agency Dashboard** is available with the Agency plan ($99/month). Upgrade to access multi-client management and bulk operations.")
@@ -66,311 +481,21 @@ def render():
             st.page_link("pages/7_Billing.py", label="Go to Billing →")
         return
 
+    # Every workspace the user belongs to, shared by the bulk operations and comparison tabs
+    all_workspaces = cached_user_workspaces(user["id"])
+
     # Tabs for different agency functions
     tab1, tab2, tab3, tab4 = st.tabs(["📊 Overview", "👥 Client Management", "⚡ Bulk Operations", "📈 Analytics"])
 
+    # Each tab is a fragment, so a widget in one tab doesn't rerun the others
     with tab1:
-        section_header("Agency Overview")
-        
-        # Get analytics for current workspace
-        analytics = get_workspace_analytics(workspace_id=workspace_id, days=30)
-        
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            st.metric("Newsletters Sent (30d)", int(analytics["newsletters_sent"]))
-        with col2:
-            st.metric("Active Sources", analytics["sources_count"])
-        with col3:
-            st.metric("Team Members", analytics["members_count"])
-        with col4:
-            st.metric("Drafts Created (30d)", analytics["drafts_count"])
-        
-        st.divider()
-        
-        # Recent bulk operations
-        section_header("Recent Bulk Operations")
-        bulk_ops = get_bulk_operations(workspace_id=workspace_id, limit=5)
-        
-        if bulk_ops:
-            for op in bulk_ops:
-                status_emoji = {
-                    "pending": "⏳",
-                    "running": "🔄",
-                    "completed": "✅",
-                    "failed": "❌"
-                }.get(op["status"], "❓")
-                
-                st.write(f"{status_emoji} **{op['operation_type'].replace('_', ' ').title()}** - {op['status'].title()}")
-                st.caption(f"Created by {op.get('users', {}).get('name', 'Unknown')} • {op['created_at'][:16]}")
-        else:
-            st.info("No bulk operations yet. Create some in the Bulk Operations tab.")
-
+        _tab_overview(workspace_id)
     with tab2:
-        section_header("Client Management")
-        
-        # Create new client
-        with st.expander("➕ Add New Client"):
-            with st.form("add_client_form"):
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    client_name = st.text_input("Client Name", placeholder="Acme Corp")
-                    client_email = st.text_input("Client Email", placeholder="contact@acme.com")
-                    client_website = st.text_input("Client Website", placeholder="https://acme.com")
-                
-                with col2:
-                    industry = st.text_input("Industry", placeholder="Technology")
-                    contact_person = st.text_input("Contact Person", placeholder="John Doe")
-                    notes = st.text_area("Notes", placeholder="Client preferences, special requirements...")
-                
-                submitted = st.form_submit_button("Add Client")
-                
-                if submitted and client_name:
-                    try:
-                        client = create_client_profile(
-                            workspace_id=workspace_id,
-                            client_name=client_name,
-                            client_email=client_email,
-                            client_website=client_website,
-                            industry=industry,
-                            contact_person=contact_person,
-                            notes=notes
-                        )
-                        st.success(f"✅ Client '{client_name}' added successfully!")
-                        st.rerun()
-                    except Exception as e:
-                        st.error(f"❌ Failed to add client: {e}")
-        
-        # List existing clients
-        clients = get_client_profiles(workspace_id=workspace_id)
-        
-        if clients:
-            st.markdown("### Client List")
-            for client in clients:
-                with st.expander(f"🏢 {client['client_name']}"):
-                    col1, col2 = st.columns([3, 1])
-                    
-                    with col1:
-                        st.write(f"**Email:** {client.get('client_email', 'Not provided')}")
-                        st.write(f"**Website:** {client.get('client_website', 'Not provided')}")
-                        st.write(f"**Industry:** {client.get('industry', 'Not specified')}")
-                        st.write(f"**Contact:** {client.get('contact_person', 'Not specified')}")
-                        if client.get('notes'):
-                            st.write(f"**Notes:** {client['notes']}")
-                    
-                    with col2:
-                        if st.button("Edit", key=f"edit_{client['id']}"):
-                            st.session_state[f"edit_client_{client['id']}"] = True
-                        
-                        if st.button("Delete", key=f"delete_{client['id']}"):
-                            try:
-                                delete_client_profile(client_id=client["id"])
-                                st.success("Client deleted")
-                                st.rerun()
-                            except Exception as e:
-                                st.error(f"Failed to delete: {e}")
-                    
-                    # Edit form
-                    if st.session_state.get(f"edit_client_{client['id']}", False):
-                        st.markdown("---")
-                        with st.form(f"edit_form_{client['id']}"):
-                            new_name = st.text_input("Client Name", value=client["client_name"])
-                            new_email = st.text_input("Client Email", value=client.get("client_email", ""))
-                            new_website = st.text_input("Client Website", value=client.get("client_website", ""))
-                            new_industry = st.text_input("Industry", value=client.get("industry", ""))
-                            new_contact = st.text_input("Contact Person", value=client.get("contact_person", ""))
-                            new_notes = st.text_area("Notes", value=client.get("notes", ""))
-                            
-                            if st.form_submit_button("Update Client"):
-                                try:
-                                    update_client_profile(
-                                        client_id=client["id"],
-                                        client_name=new_name,
-                                        client_email=new_email,
-                                        client_website=new_website,
-                                        industry=new_industry,
-                                        contact_person=new_contact,
-                                        notes=new_notes
-                                    )
-                                    st.success("Client updated!")
-                                    st.session_state[f"edit_client_{client['id']}"] = False
-                                    st.rerun()
-                                except Exception as e:
-                                    st.error(f"Failed to update: {e}")
-        else:
-            st.info("No clients yet. Add your first client above.")
-
+        _tab_clients(workspace_id)
     with tab3:
-        section_header("Bulk Operations")
-        
-        # Get all workspaces for bulk operations
-        all_workspaces = get_user_workspaces(user_id=user["id"])
-        workspace_options = {f"{w['workspaces']['name']} ({w['role']})": w["workspace_id"] for w in all_workspaces}
-        
-        if not workspace_options:
-            st.info("No workspaces available for bulk operations.")
-            return
-        
-        # Bulk operations
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            st.markdown("#### 📥 Bulk Fetch Sources")
-            st.caption("Fetch content from all sources across selected workspaces")
-            
-            selected_workspaces_fetch = st.multiselect(
-                "Select workspaces",
-                options=list(workspace_options.keys()),
-                key="bulk_fetch_workspaces"
-            )
-            
-            if st.button("🚀 Run Bulk Fetch", key="bulk_fetch"):
-                if selected_workspaces_fetch:
-                    target_workspaces = [workspace_options[w] for w in selected_workspaces_fetch]
-                    try:
-                        with st.spinner("Running bulk fetch..."):
-                            result = run_bulk_fetch(
-                                workspace_id=workspace_id,
-                                target_workspaces=target_workspaces,
-                                created_by=user["id"]
-                            )
-                        st.success(f"✅ Bulk fetch completed! {result['progress']['completed']} workspaces processed.")
-                    except Exception as e:
-                        st.error(f"❌ Bulk fetch failed: {e}")
-                else:
-                    st.warning("Please select at least one workspace.")
-        
-        with col2:
-            st.markdown("#### ✍️ Bulk Generate Drafts")
-            st.caption("Generate newsletter drafts for selected workspaces")
-            
-            selected_workspaces_generate = st.multiselect(
-                "Select workspaces",
-                options=list(workspace_options.keys()),
-                key="bulk_generate_workspaces"
-            )
-            
-            temp = st.slider("Creativity", 0.0, 1.0, 0.7, key="bulk_temp")
-            links = st.slider("Number of links", 3, 10, 5, key="bulk_links")
-            
-            if st.button("🚀 Run Bulk Generate", key="bulk_generate"):
-                if selected_workspaces_generate:
-                    target_workspaces = [workspace_options[w] for w in selected_workspaces_generate]
-                    try:
-                        with st.spinner("Running bulk generate..."):
-                            result = run_bulk_generate(
-                                workspace_id=workspace_id,
-                                target_workspaces=target_workspaces,
-                                created_by=user["id"],
-                                temperature=temp,
-                                num_links=links
-                            )
-                        st.success(f"✅ Bulk generate completed! {result['progress']['completed']} workspaces processed.")
-                    except Exception as e:
-                        st.error(f"❌ Bulk generate failed: {e}")
-                else:
-                    st.warning("Please select at least one workspace.")
-        
-        with col3:
-            st.markdown("#### 📧 Bulk Send Newsletters")
-            st.caption("Send newsletter drafts to all selected workspaces")
-            
-            selected_workspaces_send = st.multiselect(
-                "Select workspaces",
-                options=list(workspace_options.keys()),
-                key="bulk_send_workspaces"
-            )
-            
-            if st.button("🚀 Run Bulk Send", key="bulk_send"):
-                if selected_workspaces_send:
-                    target_workspaces = [workspace_options[w] for w in selected_workspaces_send]
-                    try:
-                        with st.spinner("Running bulk send..."):
-                            result = run_bulk_send(
-                                workspace_id=workspace_id,
-                                target_workspaces=target_workspaces,
-                                created_by=user["id"]
-                            )
-                        st.success(f"✅ Bulk send completed! {result['progress']['completed']} newsletters sent.")
-                    except Exception as e:
-                        st.error(f"❌ Bulk send failed: {e}")
-                else:
-                    st.warning("Please select at least one workspace.")
-        
-        st.divider()
-        
-        # Recent bulk operations
-        section_header("Operation History")
-        bulk_ops = get_bulk_operations(workspace_id=workspace_id, limit=10)
-        
-        if bulk_ops:
-            for op in bulk_ops:
-                status_emoji = {
-                    "pending": "⏳",
-                    "running": "🔄",
-                    "completed": "✅",
-                    "failed": "❌"
-                }.get(op["status"], "❓")
-                
-                with st.expander(f"{status_emoji} {op['operation_type'].replace('_', ' ').title()} - {op['status'].title()}"):
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        st.write(f"**Created:** {op['created_at'][:16]}")
-                        st.write(f"**Created by:** {op.get('users', {}).get('name', 'Unknown')}")
-                        st.write(f"**Target workspaces:** {len(op['target_workspaces'])}")
-                    
-                    with col2:
-                        if op.get('progress'):
-                            progress = op['progress']
-                            st.write(f"**Progress:** {progress.get('completed', 0)}/{progress.get('total', 0)} completed")
-                            if progress.get('failed', 0) > 0:
-                                st.write(f"**Failed:** {progress['failed']}")
-                    
-                    if op.get('error_message'):
-                        st.error(f"Error: {op['error_message']}")
-                    
-                    if op.get('results'):
-                        st.json(op['results'])
-        else:
-            st.info("No bulk operations yet.")
-
+        _tab_bulk(user, workspace_id, all_workspaces)
     with tab4:
-        section_header("Analytics Dashboard")
-        
-        # Workspace comparison
-        st.markdown("### Workspace Comparison")
-        
-        workspace_analytics = []
-        for workspace_data in all_workspaces:
-            ws_id = workspace_data["workspace_id"]
-            ws_name = workspace_data["workspaces"]["name"]
-            analytics = get_workspace_analytics(workspace_id=ws_id, days=30)
-            workspace_analytics.append({
-                "name": ws_name,
-                "newsletters": analytics["newsletters_sent"],
-                "sources": analytics["sources_count"],
-                "members": analytics["members_count"],
-                "drafts": analytics["drafts_count"]
-            })
-        
-        if workspace_analytics:
-            import pandas as pd
-            df = pd.DataFrame(workspace_analytics)
-            st.dataframe(df, use_container_width=True)
-            
-            # Charts
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.markdown("#### Newsletters Sent (30 days)")
-                st.bar_chart(df.set_index("name")["newsletters"])
-            
-            with col2:
-                st.markdown("#### Active Sources")
-                st.bar_chart(df.set_index("name")["sources"])
-        else:
-            st.info("No workspace data available yet.")
+        _tab_analytics(all_workspaces)
 
 
 if __name__ == "__main__":
@@ -1,21 +1,19 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime, timedelta
 from utils.ui import inject_global_css, header, section_header
 from services.supabase_client import (
-    get_current_user,
+    get_session_user,
     get_user_workspace_role,
-    get_analytics_events,
-    get_analytics_reports,
-    get_analytics_dashboards,
+    cached_analytics_overview,
+    cached_analytics_reports,
+    cached_analytics_dashboards,
     create_analytics_dashboard,
     update_analytics_dashboard,
     delete_analytics_dashboard,
-    get_cost_trends,
-    get_usage_trends,
+    cached_cost_trends_with_summary,
+    cached_usage_trends_with_summary,
     get_workspace_analytics,
+    get_user_subscription,
 )
 from services.analytics_service import (
     AnalyticsReporter,
@@ -23,8 +21,18 @@ from services.analytics_service import (
 )
 
 
+_EVENT_EMOJI = {
+    'api_call': '🔌',
+    'storage_upload': '📁',
+    'email_sent': '📧',
+    'source_fetch': '📥',
+    'draft_generate': '✍️',
+    'user_action': '👤'
+}
+
+
 def auth_guard():
-    user = get_current_user()
+    user = get_session_user()
     if not user:
         st.error("Please login from the main page.")
         st.stop()
@@ -47,6 +55,326 @@ def auth_guard():
     return user, current_workspace, user_role
 
 
+@st.cache_resource(show_spinner=False)
+def _reporter() -> AnalyticsReporter:
+    # Stateless apart from the shared Supabase client, so one instance serves every session
+    return AnalyticsReporter()
+
+
+@st.cache_resource(show_spinner=False)
+def _tracker() -> AnalyticsTracker:
+    return AnalyticsTracker()
+
+
+_EVENT_TYPES = ['api_call', 'email_sent', 'source_fetch', 'draft_generate', 'storage_upload']
+
+
+def _clear_analytics_caches(workspace_id: str, days: int):
+    """Drop this workspace's cached analytics reads so the next run goes back to Supabase"""
+    event_type = st.session_state.get("trends_event_type", _EVENT_TYPES[0])
+    cached_analytics_overview.clear(workspace_id, days, 20)
+    cached_cost_trends_with_summary.clear(workspace_id, days)
+    cached_usage_trends_with_summary.clear(workspace_id, event_type, days)
+    cached_analytics_reports.clear(workspace_id, 20)
+    cached_analytics_dashboards.clear(workspace_id)
+
+
+@st.fragment
+def _tab_overview(overview: dict):
+    """Overview tab: headline metrics, cost and provider charts, recent events"""
+    # Chart libraries are imported per tab so the Reports and Settings tabs never load them
+    import pandas as pd
+    import plotly.express as px
+
+    section_header("Analytics Overview")
+    
+    usage_summary = overview['usage_summary']
+    
+    # Key metrics
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Total Cost", f"${usage_summary['total_cost_dollars']:.2f}")
+    with col2:
+        st.metric("API Calls", usage_summary['api_calls']['total'])
+    with col3:
+        st.metric("Emails Sent", usage_summary['emails']['sent'])
+    with col4:
+        st.metric("Draft Generations", usage_summary['content']['draft_generations'])
+    
+    st.divider()
+    
+    # Cost breakdown pie chart
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("#### Cost Breakdown")
+        cost_data = overview['cost_breakdown']
+        
+        if cost_data['by_category']:
+            fig_pie = px.pie(
+                values=list(cost_data['by_category'].values()),
+                names=list(cost_data['by_category'].keys()),
+                title="Costs by Category"
+            )
+            st.plotly_chart(fig_pie, use_container_width=True, key="analytics_cost_pie")
+        else:
+            st.info("No cost data available for this period.")
+    
+    with col2:
+        st.markdown("#### API Usage by Provider")
+        api_providers = usage_summary['api_calls']['by_provider']
+        
+        if api_providers:
+            fig_bar = px.bar(
+                x=list(api_providers.keys()),
+                y=list(api_providers.values()),
+                title="API Calls by Provider"
+            )
+            st.plotly_chart(fig_bar, use_container_width=True, key="analytics_provider_bar")
+        else:
+            st.info("No API usage data available for this period.")
+    
+    # Recent events
+    section_header("Recent Events")
+    recent_events = overview['recent_events']
+    
+    if recent_events:
+        # Format every timestamp in one vectorized pass, then walk the plain dicts
+        dates = pd.to_datetime([e['created_at'] for e in recent_events], format='ISO8601', utc=True).strftime('%Y-%m-%d %H:%M')
+        for event, date in zip(recent_events, dates):
+            event_emoji = _EVENT_EMOJI.get(event['event_type'], '❓')
+            st.write(f"{event_emoji} **{event['event_name']}** - {date}")
+            if event.get('cost_cents', 0) > 0:
+                st.caption(f"Cost: ${event['cost_cents']/100:.2f}")
+    else:
+        st.info("No recent events found.")
+
+
+@st.fragment
+def _tab_costs(workspace_id: str, days: int, cost_breakdown: dict):
+    """Costs tab: daily cost trend and breakdown by event type"""
+    import numpy as np
+    import pandas as pd
+    import plotly.express as px
+
+    section_header("Cost Analysis")
+    
+    # Cost trends over time; the daily buckets and summary tiles come from one RPC
+    cost_trends = cached_cost_trends_with_summary(workspace_id, days)
+    
+    if cost_trends['points']:
+        cost_df = pd.DataFrame(cost_trends['points'])
+        cost_df['date'] = pd.to_datetime(cost_df['date'], format='%Y-%m-%d')
+        
+        fig_line = px.line(
+            cost_df,
+            x='date',
+            y='cost_dollars',
+            title=f"Daily Costs (Last {days} Days)",
+            labels={'cost_dollars': 'Cost ($)', 'date': 'Date'},
+            render_mode='webgl'
+        )
+        st.plotly_chart(fig_line, use_container_width=True, key="analytics_cost_line")
+        
+        # Cost summary
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Total Cost", f"${cost_trends['total_dollars']:.2f}")
+        with col2:
+            st.metric("Average Daily", f"${cost_trends['mean_dollars']:.2f}")
+        with col3:
+            st.metric("Peak Day", f"${cost_trends['max_dollars']:.2f}")
+    else:
+        st.info("No cost data available for this period.")
+    
+    # Detailed cost breakdown, shared with the Overview pie chart
+    by_type = cost_breakdown['by_event_type']
+    
+    if by_type:
+        st.markdown("#### Cost by Event Type")
+        # Columnar build: one float array divided once, no per-row dicts for pandas to infer
+        cost_df = pd.DataFrame({
+            "Event Type": list(by_type),
+            "Cost ($)": np.fromiter(by_type.values(), dtype=np.float64, count=len(by_type)) / 100,
+        })
+        st.dataframe(cost_df, use_container_width=True)
+
+
+@st.fragment
+def _tab_trends(workspace_id: str, days: int):
+    """Usage Trends tab; the event-type selector reruns only this tab"""
+    import pandas as pd
+    import plotly.graph_objects as go
+
+    section_header("Usage Trends")
+    
+    # Event type selector
+    selected_event_type = st.selectbox("Select Event Type", _EVENT_TYPES, key="trends_event_type")
+    
+    # Get usage trends; the daily buckets and summary tiles come from one RPC
+    usage_trends = cached_usage_trends_with_summary(workspace_id, selected_event_type, days)
+    
+    if usage_trends['points']:
+        trends_df = pd.DataFrame(usage_trends['points'])
+        trends_df['date'] = pd.to_datetime(trends_df['date'], format='%Y-%m-%d')
+        
+        # px.area has no WebGL mode, so draw the filled line as a Scattergl trace directly
+        fig_area = go.Figure(go.Scattergl(x=trends_df['date'], y=trends_df['count'], mode='lines', fill='tozeroy'))
+        fig_area.update_layout(
+            title=f"{selected_event_type.replace('_', ' ').title()} Trends",
+            xaxis_title='Date',
+            yaxis_title='Count'
+        )
+        st.plotly_chart(fig_area, use_container_width=True, key="analytics_usage_area")
+        
+        # Usage summary
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Total Events", usage_trends['total'])
+        with col2:
+            st.metric("Average Daily", f"{usage_trends['mean']:.1f}")
+        with col3:
+            st.metric("Peak Day", usage_trends['max'])
+    else:
+        st.info(f"No {selected_event_type} data available for this period.")
+
+
+@st.fragment
+def _tab_reports(user: dict, workspace_id: str):
+    """Reports tab; generating or viewing a report reruns only this tab"""
+    section_header("Analytics Reports")
+    
+    # Generate new report
+    with st.expander("📊 Generate New Report"):
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            report_type = st.selectbox("Report Type", ["usage", "cost", "performance", "engagement"])
+            period_start = st.date_input("Start Date", value=datetime.now() - timedelta(days=30))
+        
+        with col2:
+            period_end = st.date_input("End Date", value=datetime.now())
+            
+            if st.button("Generate Report"):
+                try:
+                    start_dt = datetime.combine(period_start, datetime.min.time())
+                    end_dt = datetime.combine(period_end, datetime.max.time())
+                    
+                    report = _reporter().generate_report(
+                        workspace_id=workspace_id,
+                        report_type=report_type,
+                        period_start=start_dt,
+                        period_end=end_dt,
+                        generated_by=user["id"]
+                    )
+                    
+                    cached_analytics_reports.clear(workspace_id, 20)
+                    st.success(f"✅ {report_type.title()} report generated successfully!")
+                    st.rerun(scope="fragment")
+                except Exception as e:
+                    st.error(f"❌ Failed to generate report: {e}")
+    
+    # List existing reports
+    reports = cached_analytics_reports(workspace_id, 20)
+    
+    if reports:
+        st.markdown("### Recent Reports")
+        for report in reports:
+            with st.expander(f"📋 {report['report_type'].title()} Report - {report['generated_at'][:10]}"):
+                col1, col2 = st.columns([3, 1])
+                
+                with col1:
+                    st.write(f"**Period:** {report['period_start'][:10]} to {report['period_end'][:10]}")
+                    st.write(f"**Generated by:** {report.get('users', {}).get('name', 'Unknown')}")
+                    st.write(f"**Generated at:** {report['generated_at'][:16]}")
+                
+                with col2:
+                    if st.button("View Data", key=f"view_{report['id']}"):
+                        st.json(report['data'])
+    else:
+        st.info("No reports generated yet.")
+
+
+@st.fragment
+def _tab_settings(user: dict, workspace_id: str):
+    """Settings tab; dashboard edits rerun only this tab"""
+    section_header("Analytics Settings")
+    
+    # Dashboard management
+    st.markdown("### Custom Dashboards")
+    
+    dashboards = cached_analytics_dashboards(workspace_id)
+    
+    if dashboards:
+        for dashboard in dashboards:
+            with st.expander(f"📊 {dashboard['dashboard_name']}"):
+                col1, col2 = st.columns([3, 1])
+                
+                with col1:
+                    st.write(f"**Created by:** {dashboard.get('users', {}).get('name', 'Unknown')}")
+                    st.write(f"**Created:** {dashboard['created_at'][:16]}")
+                    if dashboard.get('is_default'):
+                        st.write("**Default Dashboard**")
+                
+                with col2:
+                    if st.button("Edit", key=f"edit_dash_{dashboard['id']}"):
+                        st.session_state[f"edit_dashboard_{dashboard['id']}"] = True
+                    
+                    if st.button("Delete", key=f"delete_dash_{dashboard['id']}"):
+                        try:
+                            delete_analytics_dashboard(dashboard_id=dashboard["id"])
+                            cached_analytics_dashboards.clear(workspace_id)
+                            st.success("Dashboard deleted")
+                            st.rerun(scope="fragment")
+                        except Exception as e:
+                            st.error(f"Failed to delete: {e}")
+                
+                # Edit form
+                if st.session_state.get(f"edit_dashboard_{dashboard['id']}", False):
+                    st.markdown("---")
+                    with st.form(f"edit_dashboard_form_{dashboard['id']}"):
+                        new_name = st.text_input("Dashboard Name", value=dashboard["dashboard_name"])
+                        
+                        if st.form_submit_button("Update Dashboard"):
+                            try:
+                                update_analytics_dashboard(
+                                    dashboard_id=dashboard["id"],
+                                    dashboard_name=new_name
+                                )
+                                cached_analytics_dashboards.clear(workspace_id)
+                                st.success("Dashboard updated!")
+                                st.session_state[f"edit_dashboard_{dashboard['id']}"] = False
+                                st.rerun(scope="fragment")
+                            except Exception as e:
+                                st.error(f"Failed to update: {e}")
+    else:
+        st.info("No custom dashboards created yet.")
+    
+    # Create new dashboard
+    with st.expander("➕ Create New Dashboard"):
+        with st.form("create_dashboard_form"):
+            dashboard_name = st.text_input("Dashboard Name", placeholder="My Custom Dashboard")
+            is_default = st.checkbox("Set as Default Dashboard")
+            
+            if st.form_submit_button("Create Dashboard"):
+                if dashboard_name:
+                    try:
+                        dashboard = create_analytics_dashboard(
+                            workspace_id=workspace_id,
+                            dashboard_name=dashboard_name,
+                            dashboard_config={},
+                            created_by=user["id"],
+                            is_default=is_default
+                        )
+                        cached_analytics_dashboards.clear(workspace_id)
+                        st.success(f"✅ Dashboard '{dashboard_name}' created successfully!")
+                        st.rerun(scope="fragment")
+                    except Exception as e:
+                        st.error(f"❌ Failed to create dashboard: {e}")
+                else:
+                    st.warning("Please enter a dashboard name.")
+
+
 def render():
     st.set_page_config(page_title="Analytics Dashboard — CreatorPulse", page_icon="📊", layout="wide")
     inject_global_css()
@@ -58,7 +386,6 @@ def render():
     header("Analytics Dashboard", f"Advanced usage analytics and insights. Workspace: {workspace_name} ({user_role})")
 
     # Check if user has Pro or Agency plan
-    from services.supabase_client import get_user_subscription
     subscription = get_user_subscription(user_id=user["id"])
     plan_id = subscription.get("plan_id", "free") if subscription else "free"
     
@@ -73,301 +400,34 @@ def render():
     with col1:
         days = st.selectbox("Time Period", [7, 30, 90], index=1)
     with col2:
-        refresh = st.button("🔄 Refresh Data")
+        st.button("🔄 Refresh Data", on_click=_clear_analytics_caches, args=(workspace_id, days))
     with col3:
         st.caption(f"Showing data for the last {days} days")
 
-    # Initialize analytics services
-    reporter = AnalyticsReporter()
-    tracker = AnalyticsTracker()
-
     # Track page visit
-    tracker.track_user_action(
+    _tracker().track_user_action(
         user_id=user["id"],
         workspace_id=workspace_id,
         action="page_visit",
         page="analytics_dashboard"
     )
 
+    # Usage summary, cost breakdown and recent events come from one RPC; the Overview and Costs tabs share it
+    overview = cached_analytics_overview(workspace_id, days, 20)
+
     # Tabs for different analytics views
     tab1, tab2, tab3, tab4, tab5 = st.tabs(["📊 Overview", "💰 Costs", "📈 Usage Trends", "📋 Reports", "⚙️ Settings"])
 
     with tab1:
-        section_header("Analytics Overview")
-        
-        # Get usage summary
-        usage_summary = reporter.get_usage_summary(workspace_id=workspace_id, days=days)
-        
-        # Key metrics
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            st.metric("Total Cost", f"${usage_summary['total_cost_dollars']:.2f}")
-        with col2:
-            st.metric("API Calls", usage_summary['api_calls']['total'])
-        with col3:
-            st.metric("Emails Sent", usage_summary['emails']['sent'])
-        with col4:
-            st.metric("Draft Generations", usage_summary['content']['draft_generations'])
-        
-        st.divider()
-        
-        # Cost breakdown pie chart
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.markdown("#### Cost Breakdown")
-            cost_data = reporter.get_cost_breakdown(workspace_id=workspace_id, days=days)
-            
-            if cost_data['by_category']:
-                fig_pie = px.pie(
-                    values=list(cost_data['by_category'].values()),
-                    names=list(cost_data['by_category'].keys()),
-                    title="Costs by Category"
-                )
-                st.plotly_chart(fig_pie, use_container_width=True)
-            else:
-                st.info("No cost data available for this period.")
-        
-        with col2:
-            st.markdown("#### API Usage by Provider")
-            api_providers = usage_summary['api_calls']['by_provider']
-            
-            if api_providers:
-                fig_bar = px.bar(
-                    x=list(api_providers.keys()),
-                    y=list(api_providers.values()),
-                    title="API Calls by Provider"
-                )
-                st.plotly_chart(fig_bar, use_container_width=True)
-            else:
-                st.info("No API usage data available for this period.")
-        
-        # Recent events
-        section_header("Recent Events")
-        recent_events = get_analytics_events(workspace_id=workspace_id, days=days, limit=20)
-        
-        if recent_events:
-            events_df = pd.DataFrame(recent_events)
-            events_df['created_at'] = pd.to_datetime(events_df['created_at'])
-            events_df['date'] = events_df['created_at'].dt.strftime('%Y-%m-%d %H:%M')
-            
-            # Display recent events
-            for _, event in events_df.iterrows():
-                event_emoji = {
-                    'api_call': '🔌',
-                    'storage_upload': '📁',
-                    'email_sent': '📧',
-                    'source_fetch': '📥',
-                    'draft_generate': '✍️',
-                    'user_action': '👤'
-                }.get(event['event_type'], '❓')
-                
-                st.write(f"{event_emoji} **{event['event_name']}** - {event['date']}")
-                if event.get('cost_cents', 0) > 0:
-                    st.caption(f"Cost: ${event['cost_cents']/100:.2f}")
-        else:
-            st.info("No recent events found.")
-
+        _tab_overview(overview)
     with tab2:
-        section_header("Cost Analysis")
-        
-        # Cost trends over time
-        cost_trends = get_cost_trends(workspace_id=workspace_id, days=days)
-        
-        if cost_trends:
-            cost_df = pd.DataFrame(cost_trends)
-            cost_df['date'] = pd.to_datetime(cost_df['date'])
-            
-            fig_line = px.line(
-                cost_df,
-                x='date',
-                y='cost_dollars',
-                title=f"Daily Costs (Last {days} Days)",
-                labels={'cost_dollars': 'Cost ($)', 'date': 'Date'}
-            )
-            st.plotly_chart(fig_line, use_container_width=True)
-            
-            # Cost summary
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("Total Cost", f"${cost_df['cost_dollars'].sum():.2f}")
-            with col2:
-                st.metric("Average Daily", f"${cost_df['cost_dollars'].mean():.2f}")
-            with col3:
-                st.metric("Peak Day", f"${cost_df['cost_dollars'].max():.2f}")
-        else:
-            st.info("No cost data available for this period.")
-        
-        # Detailed cost breakdown
-        cost_breakdown = reporter.get_cost_breakdown(workspace_id=workspace_id, days=days)
-        
-        if cost_breakdown['by_event_type']:
-            st.markdown("#### Cost by Event Type")
-            cost_df = pd.DataFrame([
-                {"Event Type": event_type, "Cost ($)": cost_cents / 100}
-                for event_type, cost_cents in cost_breakdown['by_event_type'].items()
-            ])
-            st.dataframe(cost_df, use_container_width=True)
-
+        _tab_costs(workspace_id, days, overview['cost_breakdown'])
     with tab3:
-        section_header("Usage Trends")
-        
-        # Event type selector
-        event_types = ['api_call', 'email_sent', 'source_fetch', 'draft_generate', 'storage_upload']
-        selected_event_type = st.selectbox("Select Event Type", event_types)
-        
-        # Get usage trends
-        usage_trends = get_usage_trends(workspace_id=workspace_id, event_type=selected_event_type, days=days)
-        
-        if usage_trends:
-            trends_df = pd.DataFrame(usage_trends)
-            trends_df['date'] = pd.to_datetime(trends_df['date'])
-            
-            fig_area = px.area(
-                trends_df,
-                x='date',
-                y='count',
-                title=f"{selected_event_type.replace('_', ' ').title()} Trends",
-                labels={'count': 'Count', 'date': 'Date'}
-            )
-            st.plotly_chart(fig_area, use_container_width=True)
-            
-            # Usage summary
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("Total Events", trends_df['count'].sum())
-            with col2:
-                st.metric("Average Daily", f"{trends_df['count'].mean():.1f}")
-            with col3:
-                st.metric("Peak Day", trends_df['count'].max())
-        else:
-            st.info(f"No {selected_event_type} data available for this period.")
-
+        _tab_trends(workspace_id, days)
     with tab4:
-        section_header("Analytics Reports")
-        
-        # Generate new report
-        with st.expander("📊 Generate New Report"):
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                report_type = st.selectbox("Report Type", ["usage", "cost", "performance", "engagement"])
-                period_start = st.date_input("Start Date", value=datetime.now() - timedelta(days=30))
-            
-            with col2:
-                period_end = st.date_input("End Date", value=datetime.now())
-                
-                if st.button("Generate Report"):
-                    try:
-                        start_dt = datetime.combine(period_start, datetime.min.time())
-                        end_dt = datetime.combine(period_end, datetime.max.time())
-                        
-                        report = reporter.generate_report(
-                            workspace_id=workspace_id,
-                            report_type=report_type,
-                            period_start=start_dt,
-                            period_end=end_dt,
-                            generated_by=user["id"]
-                        )
-                        
-                        st.success(f"✅ {report_type.title()} report generated successfully!")
-                        st.rerun()
-                    except Exception as e:
-                        st.error(f"❌ Failed to generate report: {e}")
-        
-        # List existing reports
-        reports = get_analytics_reports(workspace_id=workspace_id, limit=20)
-        
-        if reports:
-            st.markdown("### Recent Reports")
-            for report in reports:
-                with st.expander(f"📋 {report['report_type'].title()} Report - {report['generated_at'][:10]}"):
-                    col1, col2 = st.columns([3, 1])
-                    
-                    with col1:
-                        st.write(f"**Period:** {report['period_start'][:10]} to {report['period_end'][:10]}")
-                        st.write(f"**Generated by:** {report.get('users', {}).get('name', 'Unknown')}")
-                        st.write(f"**Generated at:** {report['generated_at'][:16]}")
-                    
-                    with col2:
-                        if st.button("View Data", key=f"view_{report['id']}"):
-                            st.json(report['data'])
-        else:
-            st.info("No reports generated yet.")
-
+        _tab_reports(user, workspace_id)
     with tab5:
-        section_header("Analytics Settings")
-        
-        # Dashboard management
-        st.markdown("### Custom Dashboards")
-        
-        dashboards = get_analytics_dashboards(workspace_id=workspace_id)
-        
-        if dashboards:
-            for dashboard in dashboards:
-                with st.expander(f"📊 {dashboard['dashboard_name']}"):
-                    col1, col2 = st.columns([3, 1])
-                    
-                    with col1:
-                        st.write(f"**Created by:** {dashboard.get('users', {}).get('name', 'Unknown')}")
-                        st.write(f"**Created:** {dashboard['created_at'][:16]}")
-                        if dashboard.get('is_default'):
-                            st.write("**Default Dashboard**")
-                    
-                    with col2:
-                        if st.button("Edit", key=f"edit_dash_{dashboard['id']}"):
-                            st.session_state[f"edit_dashboard_{dashboard['id']}"] = True
-                        
-                        if st.button("Delete", key=f"delete_dash_{dashboard['id']}"):
-                            try:
-                                delete_analytics_dashboard(dashboard_id=dashboard["id"])
-                                st.success("Dashboard deleted")
-                                st.rerun()
-                            except Exception as e:
-                                st.error(f"Failed to delete: {e}")
-                    
-                    # Edit form
-                    if st.session_state.get(f"edit_dashboard_{dashboard['id']}", False):
-                        st.markdown("---")
-                        with st.form(f"edit_dashboard_form_{dashboard['id']}"):
-                            new_name = st.text_input("Dashboard Name", value=dashboard["dashboard_name"])
-                            
-                            if st.form_submit_button("Update Dashboard"):
-                                try:
-                                    update_analytics_dashboard(
-                                        dashboard_id=dashboard["id"],
-                                        dashboard_name=new_name
-                                    )
-                                    st.success("Dashboard updated!")
-                                    st.session_state[f"edit_dashboard_{dashboard['id']}"] = False
-                                    st.rerun()
-                                except Exception as e:
-                                    st.error(f"Failed to update: {e}")
-        else:
-            st.info("No custom dashboards created yet.")
-        
-        # Create new dashboard
-        with st.expander("➕ Create New Dashboard"):
-            with st.form("create_dashboard_form"):
-                dashboard_name = st.text_input("Dashboard Name", placeholder="My Custom Dashboard")
-                is_default = st.checkbox("Set as Default Dashboard")
-                
-                if st.form_submit_button("Create Dashboard"):
-                    if dashboard_name:
-                        try:
-                            dashboard = create_analytics_dashboard(
-                                workspace_id=workspace_id,
-                                dashboard_name=dashboard_name,
-                                dashboard_config={},
-                                created_by=user["id"],
-                                is_default=is_default
-                            )
-                            st.success(f"✅ Dashboard '{dashboard_name}' created successfully!")
-                            st.rerun()
-                        except Exception as e:
-                            st.error(f"❌ Failed to create dashboard: {e}")
-                    else:
-                        st.warning("Please enter a dashboard name.")
+        _tab_settings(user, workspace_id)
 
 
 if __name__ == "__main__":
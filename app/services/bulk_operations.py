@@ -1,9 +1,15 @@
 import asyncio
-from typing import List, Dict, Any, Optional
+import os
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Dict, Any, Optional
 from services.supabase_client import (
     get_client,
     create_bulk_operation,
     update_bulk_operation_status,
+    update_bulk_operation_progress,
     get_workspace_members,
     list_recent_content,
     get_latest_draft,
@@ -14,6 +20,50 @@ from services.content_fetcher import fetch_all_sources
 from services.resend_client import send_email
 from utils.formatting import markdown_to_html, inject_tracking
 
+logger = logging.getLogger(__name__)
+
+
+# Per-workspace steps are I/O-bound (Supabase over HTTP, RSS, Groq, Resend), so threads overlap well;
+# kept small because Groq and Resend rate-limit per API key, so more threads mostly add retries and waiting
+MAX_BULK_WORKERS = 6
+# Resend's default API rate limit, in requests per second for the whole API key
+RESEND_MAX_REQUESTS_PER_SECOND = float(os.getenv("RESEND_MAX_REQUESTS_PER_SECOND", "2"))
+
+
+class _RatePacer:
+    """Spaces calls at least 1/rate seconds apart across every thread in the process"""
+    
+    def __init__(self, rate_per_second: float):
+        self._interval = 1.0 / rate_per_second
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+    
+    def wait(self) -> None:
+        # Reserve the next free slot under the lock, then sleep outside it so other threads can queue up
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self._interval
+        time.sleep(slot - now)
+
+
+_resend_pacer = _RatePacer(RESEND_MAX_REQUESTS_PER_SECOND)
+# Background runner for start_bulk_*; operations record their own status, so callers just poll the row.
+# Shared by every agency in the process and each operation fans out to MAX_BULK_WORKERS threads,
+# so this bounds total threads at BULK_BACKGROUND_WORKERS * MAX_BULK_WORKERS; later runs wait as "pending"
+BULK_BACKGROUND_WORKERS = int(os.getenv("BULK_BACKGROUND_WORKERS", "4"))
+_background_executor = ThreadPoolExecutor(max_workers=BULK_BACKGROUND_WORKERS, thread_name_prefix="bulk-op")
+
+
+def _log_background_failure(future) -> None:
+    """Done callback: nobody waits on background futures, so surface their exceptions in the log"""
+    if not future.cancelled() and future.exception() is not None:
+        logger.error("Background bulk operation failed", exc_info=future.exception())
+
+
+def _submit_background(fn: Callable[..., Any], *args, **kwargs) -> None:
+    _background_executor.submit(fn, *args, **kwargs).add_done_callback(_log_background_failure)
+
 
 class BulkOperationManager:
     """Manages bulk operations across multiple workspaces"""
@@ -21,6 +71,95 @@ class BulkOperationManager:
     def __init__(self):
         self.sb = get_client()
     
+    def _run_for_workspaces(self, operation_id: int, target_workspaces: List[str], worker: Callable[[str], Dict[str, Any]]) -> tuple[Dict[str, Any], Dict[str, int]]:
+        """Run worker for each workspace concurrently, publishing progress as each one finishes"""
+        results: Dict[str, Any] = {}
+        progress = {"total": len(target_workspaces), "completed": 0, "failed": 0}
+        if not target_workspaces:
+            return results, progress
+        
+        with ThreadPoolExecutor(max_workers=min(MAX_BULK_WORKERS, len(target_workspaces))) as executor:
+            futures = {executor.submit(worker, ws_id): ws_id for ws_id in target_workspaces}
+            for future in as_completed(futures):
+                ws_id = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {"status": "failed", "error": str(e)}
+                # as_completed yields on this thread only, so no lock is needed
+                results[ws_id] = result
+                if result.get("status") == "success":
+                    progress["completed"] += 1
+                else:
+                    progress["failed"] += 1
+                # Progress is best-effort; the final status update records the real totals
+                try:
+                    update_bulk_operation_progress(operation_id=operation_id, progress=dict(progress))
+                except Exception as e:
+                    logger.warning(f"Progress update failed for bulk operation {operation_id}: {e}")
+        
+        return results, progress
+    
+    def _first_member_id(self, workspace_id: str) -> Optional[str]:
+        """Get the first member of a workspace to run the operation as"""
+        members = get_workspace_members(workspace_id=workspace_id)
+        return members[0]["user_id"] if members else None
+    
+    def _fetch_one(self, workspace_id: str) -> Dict[str, Any]:
+        """Fetch sources for a single workspace"""
+        user_id = self._first_member_id(workspace_id)
+        if not user_id:
+            return {"status": "failed", "error": "No members found"}
+        
+        num_items = fetch_all_sources(user_id=user_id, workspace_id=workspace_id)
+        return {"status": "success", "items_fetched": num_items}
+    
+    def _generate_one(self, workspace_id: str, temperature: float, num_links: int) -> Dict[str, Any]:
+        """Generate a draft for a single workspace"""
+        user_id = self._first_member_id(workspace_id)
+        if not user_id:
+            return {"status": "failed", "error": "No members found"}
+        
+        draft_text = generate_and_save_draft(
+            user_id=user_id,
+            workspace_id=workspace_id,
+            selected_item_ids=None,
+            temperature=temperature,
+            num_links=num_links
+        )
+        
+        if draft_text:
+            return {"status": "success", "draft_generated": True, "length": len(draft_text)}
+        return {"status": "success", "draft_generated": False, "reason": "No content available"}
+    
+    def _send_one(self, workspace_id: str) -> Dict[str, Any]:
+        """Send the latest draft for a single workspace"""
+        user_id = self._first_member_id(workspace_id)
+        if not user_id:
+            return {"status": "failed", "error": "No members found"}
+        
+        # Get user email
+        user_res = self.sb.table("users").select("email").eq("id", user_id).execute()
+        if not user_res.data:
+            return {"status": "failed", "error": "User not found"}
+        
+        user_email = user_res.data[0]["email"]
+        
+        # Get latest draft
+        latest_draft = get_latest_draft(user_id=user_id)
+        if not latest_draft or not latest_draft.get("draft_text"):
+            return {"status": "failed", "error": "No draft available"}
+        
+        # Send email
+        html = markdown_to_html(latest_draft["draft_text"])
+        html = inject_tracking(html, user_id=user_id, draft_id=latest_draft.get("id"), api_url="https://npedokgktkcbeltkaovz.supabase.co/functions/v1")
+        
+        _resend_pacer.wait()
+        send_email(to_email=user_email, subject="Your CreatorPulse Draft", html_content=html)
+        mark_latest_draft_sent(user_id=user_id)
+        
+        return {"status": "success", "email_sent": True, "recipient": user_email}
+    
     def create_bulk_fetch_operation(self, *, workspace_id: str, target_workspaces: List[str], created_by: str) -> Dict[str, Any]:
         """Create a bulk source fetching operation"""
         return create_bulk_operation(
@@ -48,208 +187,52 @@ class BulkOperationManager:
             created_by=created_by
         )
     
-    def execute_bulk_fetch(self, operation_id: int) -> Dict[str, Any]:
-        """Execute bulk source fetching across workspaces"""
-        # Get operation details
-        operation_res = self.sb.table("bulk_operations").select("*").eq("id", operation_id).execute()
-        if not operation_res.data:
-            raise ValueError("Operation not found")
-        
-        operation = operation_res.data[0]
-        target_workspaces = operation["target_workspaces"]
-        
-        # Update status to running
-        update_bulk_operation_status(operation_id=operation_id, status="running")
-        
-        results = {}
-        progress = {"total": len(target_workspaces), "completed": 0, "failed": 0}
-        
+    def _execute(self, operation_id: int, worker: Callable[[str], Dict[str, Any]]) -> Dict[str, Any]:
+        """Run worker over the operation's workspaces; any failure, including the lookup, marks the row failed"""
         try:
-            for workspace_id in target_workspaces:
-                try:
-                    # Get workspace members to find a user to run the operation
-                    members = get_workspace_members(workspace_id=workspace_id)
-                    if not members:
-                        results[workspace_id] = {"status": "failed", "error": "No members found"}
-                        progress["failed"] += 1
-                        continue
-                    
-                    # Use the first member as the user
-                    user_id = members[0]["user_id"]
-                    
-                    # Fetch sources for this workspace
-                    num_items = fetch_all_sources(user_id=user_id, workspace_id=workspace_id)
-                    results[workspace_id] = {"status": "success", "items_fetched": num_items}
-                    progress["completed"] += 1
-                    
-                except Exception as e:
-                    results[workspace_id] = {"status": "failed", "error": str(e)}
-                    progress["failed"] += 1
+            # Get operation details
+            operation_res = self.sb.table("bulk_operations").select("*").eq("id", operation_id).execute()
+            if not operation_res.data:
+                raise ValueError("Operation not found")
+            target_workspaces = operation_res.data[0]["target_workspaces"]
+            
+            # Update status to running
+            update_bulk_operation_status(operation_id=operation_id, status="running")
             
-            # Update final status
-            final_status = "completed" if progress["failed"] == 0 else "completed"
+            results, progress = self._run_for_workspaces(operation_id, target_workspaces, worker)
+            
+            # Per-workspace failures are recorded in results; the operation itself completed
             update_bulk_operation_status(
                 operation_id=operation_id,
-                status=final_status,
+                status="completed",
                 progress=progress,
                 results=results
             )
             
-            return {"status": final_status, "progress": progress, "results": results}
+            return {"status": "completed", "progress": progress, "results": results}
             
         except Exception as e:
-            update_bulk_operation_status(
-                operation_id=operation_id,
-                status="failed",
-                error_message=str(e)
-            )
+            try:
+                update_bulk_operation_status(
+                    operation_id=operation_id,
+                    status="failed",
+                    error_message=str(e)
+                )
+            except Exception as status_error:
+                logger.error(f"Could not mark bulk operation {operation_id} failed: {status_error}")
             raise
     
+    def execute_bulk_fetch(self, operation_id: int) -> Dict[str, Any]:
+        """Execute bulk source fetching across workspaces"""
+        return self._execute(operation_id, self._fetch_one)
+    
     def execute_bulk_generate(self, operation_id: int, temperature: float = 0.7, num_links: int = 5) -> Dict[str, Any]:
         """Execute bulk draft generation across workspaces"""
-        # Get operation details
-        operation_res = self.sb.table("bulk_operations").select("*").eq("id", operation_id).execute()
-        if not operation_res.data:
-            raise ValueError("Operation not found")
-        
-        operation = operation_res.data[0]
-        target_workspaces = operation["target_workspaces"]
-        
-        # Update status to running
-        update_bulk_operation_status(operation_id=operation_id, status="running")
-        
-        results = {}
-        progress = {"total": len(target_workspaces), "completed": 0, "failed": 0}
-        
-        try:
-            for workspace_id in target_workspaces:
-                try:
-                    # Get workspace members to find a user to run the operation
-                    members = get_workspace_members(workspace_id=workspace_id)
-                    if not members:
-                        results[workspace_id] = {"status": "failed", "error": "No members found"}
-                        progress["failed"] += 1
-                        continue
-                    
-                    # Use the first member as the user
-                    user_id = members[0]["user_id"]
-                    
-                    # Generate draft for this workspace
-                    draft_text = generate_and_save_draft(
-                        user_id=user_id,
-                        workspace_id=workspace_id,
-                        selected_item_ids=None,
-                        temperature=temperature,
-                        num_links=num_links
-                    )
-                    
-                    if draft_text:
-                        results[workspace_id] = {"status": "success", "draft_generated": True, "length": len(draft_text)}
-                    else:
-                        results[workspace_id] = {"status": "success", "draft_generated": False, "reason": "No content available"}
-                    
-                    progress["completed"] += 1
-                    
-                except Exception as e:
-                    results[workspace_id] = {"status": "failed", "error": str(e)}
-                    progress["failed"] += 1
-            
-            # Update final status
-            final_status = "completed" if progress["failed"] == 0 else "completed"
-            update_bulk_operation_status(
-                operation_id=operation_id,
-                status=final_status,
-                progress=progress,
-                results=results
-            )
-            
-            return {"status": final_status, "progress": progress, "results": results}
-            
-        except Exception as e:
-            update_bulk_operation_status(
-                operation_id=operation_id,
-                status="failed",
-                error_message=str(e)
-            )
-            raise
+        return self._execute(operation_id, lambda ws_id: self._generate_one(ws_id, temperature, num_links))
     
     def execute_bulk_send(self, operation_id: int) -> Dict[str, Any]:
         """Execute bulk newsletter sending across workspaces"""
-        # Get operation details
-        operation_res = self.sb.table("bulk_operations").select("*").eq("id", operation_id).execute()
-        if not operation_res.data:
-            raise ValueError("Operation not found")
-        
-        operation = operation_res.data[0]
-        target_workspaces = operation["target_workspaces"]
-        
-        # Update status to running
-        update_bulk_operation_status(operation_id=operation_id, status="running")
-        
-        results = {}
-        progress = {"total": len(target_workspaces), "completed": 0, "failed": 0}
-        
-        try:
-            for workspace_id in target_workspaces:
-                try:
-                    # Get workspace members to find a user to run the operation
-                    members = get_workspace_members(workspace_id=workspace_id)
-                    if not members:
-                        results[workspace_id] = {"status": "failed", "error": "No members found"}
-                        progress["failed"] += 1
-                        continue
-                    
-                    # Use the first member as the user
-                    user_id = members[0]["user_id"]
-                    
-                    # Get user email
-                    user_res = self.sb.table("users").select("email").eq("id", user_id).execute()
-                    if not user_res.data:
-                        results[workspace_id] = {"status": "failed", "error": "User not found"}
-                        progress["failed"] += 1
-                        continue
-                    
-                    user_email = user_res.data[0]["email"]
-                    
-                    # Get latest draft
-                    latest_draft = get_latest_draft(user_id=user_id)
-                    if not latest_draft or not latest_draft.get("draft_text"):
-                        results[workspace_id] = {"status": "failed", "error": "No draft available"}
-                        progress["failed"] += 1
-                        continue
-                    
-                    # Send email
-                    html = markdown_to_html(latest_draft["draft_text"])
-                    html = inject_tracking(html, user_id=user_id, draft_id=latest_draft.get("id"), api_url="https://npedokgktkcbeltkaovz.supabase.co/functions/v1")
-                    
-                    send_email(to_email=user_email, subject="Your CreatorPulse Draft", html_content=html)
-                    mark_latest_draft_sent(user_id=user_id)
-                    
-                    results[workspace_id] = {"status": "success", "email_sent": True, "recipient": user_email}
-                    progress["completed"] += 1
-                    
-                except Exception as e:
-                    results[workspace_id] = {"status": "failed", "error": str(e)}
-                    progress["failed"] += 1
-            
-            # Update final status
-            final_status = "completed" if progress["failed"] == 0 else "completed"
-            update_bulk_operation_status(
-                operation_id=operation_id,
-                status=final_status,
-                progress=progress,
-                results=results
-            )
-            
-            return {"status": final_status, "progress": progress, "results": results}
-            
-        except Exception as e:
-            update_bulk_operation_status(
-                operation_id=operation_id,
-                status="failed",
-                error_message=str(e)
-            )
-            raise
+        return self._execute(operation_id, self._send_one)
 
 
 # Convenience functions
@@ -284,3 +267,39 @@ def run_bulk_send(*, workspace_id: str, target_workspaces: List[str], created_by
         created_by=created_by
     )
     return manager.execute_bulk_send(operation["id"])
+
+
+def start_bulk_fetch(*, workspace_id: str, target_workspaces: List[str], created_by: str) -> int:
+    """Create a pending bulk fetch operation, queue it to run in the background and return its id"""
+    manager = BulkOperationManager()
+    operation = manager.create_bulk_fetch_operation(
+        workspace_id=workspace_id,
+        target_workspaces=target_workspaces,
+        created_by=created_by
+    )
+    _submit_background(manager.execute_bulk_fetch, operation["id"])
+    return operation["id"]
+
+
+def start_bulk_generate(*, workspace_id: str, target_workspaces: List[str], created_by: str, temperature: float = 0.7, num_links: int = 5) -> int:
+    """Create a pending bulk draft generation operation, queue it to run in the background and return its id"""
+    manager = BulkOperationManager()
+    operation = manager.create_bulk_generate_operation(
+        workspace_id=workspace_id,
+        target_workspaces=target_workspaces,
+        created_by=created_by
+    )
+    _submit_background(manager.execute_bulk_generate, operation["id"], temperature=temperature, num_links=num_links)
+    return operation["id"]
+
+
+def start_bulk_send(*, workspace_id: str, target_workspaces: List[str], created_by: str) -> int:
+    """Create a pending bulk newsletter sending operation, queue it to run in the background and return its id"""
+    manager = BulkOperationManager()
+    operation = manager.create_bulk_send_operation(
+        workspace_id=workspace_id,
+        target_workspaces=target_workspaces,
+        created_by=created_by
+    )
+    _submit_background(manager.execute_bulk_send, operation["id"])
+    return operation["id"]
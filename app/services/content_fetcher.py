@@ -1,3 +1,4 @@
+import asyncio
 from typing import List, Dict, Any
 
 from .supabase_client import list_sources, save_content_items
@@ -152,20 +153,39 @@ def _fetch_rss(feed_url: str) -> List[Dict[str, Any]]:
     return items
 
 
+# Sources are independent network fetches; cap how many run at once
+_MAX_CONCURRENT_FETCHES = 10
+
+
+def _fetch_source(stype: str, sval: str) -> List[Dict[str, Any]]:
+    if stype == "twitter":
+        return _fetch_twitter(sval)
+    if stype == "youtube":
+        return _fetch_youtube(sval)
+    if stype == "rss":
+        return _fetch_rss(sval)
+    return []
+
+
+async def _fetch_all_async(sources: List[Dict[str, Any]]) -> List[Any]:
+    semaphore = asyncio.Semaphore(_MAX_CONCURRENT_FETCHES)
+
+    async def _fetch_one(s: Dict[str, Any]) -> List[Dict[str, Any]]:
+        async with semaphore:
+            return await asyncio.to_thread(_fetch_source, s.get("source_type"), s.get("source_value", ""))
+
+    return await asyncio.gather(*[_fetch_one(s) for s in sources], return_exceptions=True)
+
+
 def fetch_all_sources(*, user_id: str, workspace_id: str = None) -> int:
     sources = list_sources(user_id=user_id, workspace_id=workspace_id)
+    results = asyncio.run(_fetch_all_async(sources)) if sources else []
     collected: List[Dict[str, Any]] = []
-    for s in sources:
-        stype = s.get("source_type")
-        sval = s.get("source_value", "")
+    for s, subitems in zip(sources, results):
+        if isinstance(subitems, BaseException):
+            # One failing source shouldn't sink the whole fetch
+            continue
         boost_factor = s.get("boost_factor", 1.0)
-        subitems: List[Dict[str, Any]] = []
-        if stype == "twitter":
-            subitems = _fetch_twitter(sval)
-        elif stype == "youtube":
-            subitems = _fetch_youtube(sval)
-        elif stype == "rss":
-            subitems = _fetch_rss(sval)
         
         # Apply boost factor by duplicating items
         boosted_items = []
@@ -179,6 +199,7 @@ def fetch_all_sources(*, user_id: str, workspace_id: str = None) -> int:
         
         collected.extend(boosted_items)
 
+    # Boosted copies share a URL and collapse to one row, so report the deduplicated count
     return save_content_items(user_id=user_id, items=collected, workspace_id=workspace_id)
 
 
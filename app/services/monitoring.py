@@ -1,3 +1,4 @@
+import asyncio
 import os
 import logging
 import traceback
@@ -236,6 +237,13 @@ class SecurityValidator:
         return bool(re.match(pattern, slug)) and len(slug) >= 3 and len(slug) <= 50
 
 
+# External APIs probed by the health check: name -> (api key env var, probe url)
+_EXTERNAL_APIS = {
+    "groq": ("GROQ_API_KEY", "https://api.groq.com/openai/v1/models"),
+    "resend": ("RESEND_API_KEY", "https://api.resend.com/domains"),
+}
+
+
 class HealthChecker:
     """Health check service for monitoring system status"""
     
@@ -254,44 +262,36 @@ class HealthChecker:
             self.logger.error(f"Database health check failed: {e}")
             return {"status": "unhealthy", "error": str(e)}
     
-    def check_external_apis(self) -> Dict[str, Any]:
-        """Check external API connectivity"""
-        results = {}
-        
-        # Check Groq API
+    def _check_api(self, name: str) -> Dict[str, Any]:
+        """Probe a single external API"""
+        env_key, url = _EXTERNAL_APIS[name]
         try:
             import requests
-            groq_key = os.getenv("GROQ_API_KEY")
-            if groq_key:
-                # Simple test request
-                response = requests.get("https://api.groq.com/openai/v1/models", 
-                                      headers={"Authorization": f"Bearer {groq_key}"}, 
-                                      timeout=5)
-                results["groq"] = {"status": "healthy" if response.status_code == 200 else "unhealthy"}
-            else:
-                results["groq"] = {"status": "not_configured"}
+            api_key = os.getenv(env_key)
+            if not api_key:
+                return {"status": "not_configured"}
+            # Simple test request
+            response = requests.get(url, headers={"Authorization": f"Bearer {api_key}"}, timeout=5)
+            return {"status": "healthy" if response.status_code == 200 else "unhealthy"}
         except Exception as e:
-            results["groq"] = {"status": "unhealthy", "error": str(e)}
-        
-        # Check Resend API
-        try:
-            resend_key = os.getenv("RESEND_API_KEY")
-            if resend_key:
-                response = requests.get("https://api.resend.com/domains", 
-                                      headers={"Authorization": f"Bearer {resend_key}"}, 
-                                      timeout=5)
-                results["resend"] = {"status": "healthy" if response.status_code == 200 else "unhealthy"}
-            else:
-                results["resend"] = {"status": "not_configured"}
-        except Exception as e:
-            results["resend"] = {"status": "unhealthy", "error": str(e)}
-        
-        return results
+            return {"status": "unhealthy", "error": str(e)}
     
-    def get_system_status(self) -> Dict[str, Any]:
-        """Get overall system health status"""
-        db_status = self.check_database()
-        api_status = self.check_external_apis()
+    async def check_external_apis_async(self) -> Dict[str, Any]:
+        """Probe all external APIs concurrently"""
+        names = list(_EXTERNAL_APIS)
+        statuses = await asyncio.gather(*(asyncio.to_thread(self._check_api, name) for name in names))
+        return dict(zip(names, statuses))
+    
+    def check_external_apis(self) -> Dict[str, Any]:
+        """Check external API connectivity"""
+        return asyncio.run(self.check_external_apis_async())
+    
+    async def get_system_status_async(self) -> Dict[str, Any]:
+        """Get overall system health status, running the probes concurrently"""
+        db_status, api_status = await asyncio.gather(
+            asyncio.to_thread(self.check_database),
+            self.check_external_apis_async(),
+        )
         
         overall_status = "healthy"
         if db_status["status"] != "healthy":
@@ -305,6 +305,10 @@ class HealthChecker:
             "external_apis": api_status,
             "timestamp": time.time()
         }
+    
+    def get_system_status(self) -> Dict[str, Any]:
+        """Get overall system health status"""
+        return asyncio.run(self.get_system_status_async())
 
 
 # Global instances
@@ -3,6 +3,7 @@ from typing import List
 from .supabase_client import list_style_files, download_style_file, list_recent_content, save_draft
 from .groq_client import generate_draft as groq_generate
 from .trend_engine import compute_trends
+from utils.formatting import markdown_to_html
 
 
 def _load_style_samples(user_id: str, max_files: int = 3, max_chars: int = 6000) -> List[str]:
@@ -46,7 +47,7 @@ def generate_and_save_draft(*, user_id: str, selected_item_ids: list[int] | None
         include_trends=include_trends
     )
     if draft_text:
-        save_draft(user_id, draft_text)
+        save_draft(user_id, draft_text, draft_html=markdown_to_html(draft_text))
     return draft_text
 
 
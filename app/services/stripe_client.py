@@ -11,12 +11,13 @@ def get_stripe_client():
     return stripe
 
 
-def create_customer(*, email: str, name: str) -> Dict[str, Any]:
-    """Create a Stripe customer"""
+def create_customer(*, email: str, name: str, idempotency_key: str = None) -> Dict[str, Any]:
+    """Create a Stripe customer; a repeated idempotency_key returns the first customer instead of a new one"""
     return stripe.Customer.create(
         email=email,
         name=name,
-        metadata={"source": "creatorpulse"}
+        metadata={"source": "creatorpulse"},
+        idempotency_key=idempotency_key,
     )
 
 
@@ -98,60 +99,63 @@ def format_price(cents: int) -> str:
     return f"${cents / 100:.2f}"
 
 
+_PLAN_FEATURES = {
+    "free": {
+        "workspaces": 1,
+        "team_members": 1,
+        "sources": 5,
+        "newsletters_per_month": 10,
+        "analytics": False,
+        "priority_support": False,
+        "white_label": False
+    },
+    "pro": {
+        "workspaces": 5,
+        "team_members": 10,
+        "sources": 50,
+        "newsletters_per_month": 100,
+        "analytics": True,
+        "priority_support": True,
+        "white_label": False
+    },
+    "agency": {
+        "workspaces": 50,
+        "team_members": 100,
+        "sources": 500,
+        "newsletters_per_month": 1000,
+        "analytics": True,
+        "priority_support": True,
+        "white_label": True
+    }
+}
+
+_PLAN_LIMITS = {
+    "free": {
+        "max_workspaces": 1,
+        "max_team_members": 1,
+        "max_sources": 5,
+        "max_newsletters_per_month": 10
+    },
+    "pro": {
+        "max_workspaces": 5,
+        "max_team_members": 10,
+        "max_sources": 50,
+        "max_newsletters_per_month": 100
+    },
+    "agency": {
+        "max_workspaces": 50,
+        "max_team_members": 100,
+        "max_sources": 500,
+        "max_newsletters_per_month": 1000
+    }
+}
+
+
 def get_plan_features(plan_id: str) -> Dict[str, Any]:
     """Get features for a subscription plan"""
-    features_map = {
-        "free": {
-            "workspaces": 1,
-            "team_members": 1,
-            "sources": 5,
-            "newsletters_per_month": 10,
-            "analytics": False,
-            "priority_support": False,
-            "white_label": False
-        },
-        "pro": {
-            "workspaces": 5,
-            "team_members": 10,
-            "sources": 50,
-            "newsletters_per_month": 100,
-            "analytics": True,
-            "priority_support": True,
-            "white_label": False
-        },
-        "agency": {
-            "workspaces": 50,
-            "team_members": 100,
-            "sources": 500,
-            "newsletters_per_month": 1000,
-            "analytics": True,
-            "priority_support": True,
-            "white_label": True
-        }
-    }
-    return features_map.get(plan_id, features_map["free"])
+    return _PLAN_FEATURES.get(plan_id, _PLAN_FEATURES["free"])
 
 
 def get_plan_limits(plan_id: str) -> Dict[str, Any]:
     """Get limits for a subscription plan"""
-    limits_map = {
-        "free": {
-            "max_workspaces": 1,
-            "max_team_members": 1,
-            "max_sources": 5,
-            "max_newsletters_per_month": 10
-        },
-        "pro": {
-            "max_workspaces": 5,
-            "max_team_members": 10,
-            "max_sources": 50,
-            "max_newsletters_per_month": 100
-        },
-        "agency": {
-            "max_workspaces": 50,
-            "max_team_members": 100,
-            "max_sources": 500,
-            "max_newsletters_per_month": 1000
-        }
-    }
-    return limits_map.get(plan_id, limits_map["free"])
+    return _PLAN_LIMITS.get(plan_id, _PLAN_LIMITS["free"])
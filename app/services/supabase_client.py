@@ -1,23 +1,38 @@
+import asyncio
 import os
-from typing import Any, Dict, List, Optional
+import time
+from typing import Any, Callable, Dict, List, Optional
 
-from supabase import Client, create_client
+import streamlit as st
+from postgrest.types import ReturnMethod
+from supabase import AuthApiError, Client, ClientOptions, create_client
 
 
-_client: Optional[Client] = None
 _STYLE_BUCKET = "style-samples"
+# Fail a stuck PostgREST call in seconds rather than holding a script thread for the 120s default
+_POSTGREST_TIMEOUT_SECONDS = 10
+# How long a session user is trusted before the token is re-checked with the auth server
+_SESSION_USER_TTL_SECONDS = 60
 
 
+@st.cache_resource(show_spinner=False)
 def get_client() -> Client:
-    global _client
-    if _client is not None:
-        return _client
+    """One shared client per server process, created under Streamlit's cache lock"""
     url = os.getenv("SUPABASE_URL")
     key = os.getenv("SUPABASE_KEY")
     if not url or not key:
         raise RuntimeError("SUPABASE_URL and SUPABASE_KEY must be set in environment.")
-    _client = create_client(url, key)
-    return _client
+    return create_client(url, key, options=ClientOptions(postgrest_client_timeout=_POSTGREST_TIMEOUT_SECONDS))
+
+
+# ---------- Concurrent reads ----------
+async def _gather_reads_async(calls: tuple[Callable[[], Any], ...]) -> List[Any]:
+    return list(await asyncio.gather(*(asyncio.to_thread(call) for call in calls)))
+
+
+def gather_reads(*calls: Callable[[], Any]) -> List[Any]:
+    """Run independent zero-arg reads concurrently on the shared client; results come back in call order"""
+    return asyncio.run(_gather_reads_async(calls))
 
 
 # ---------- Auth ----------
@@ -53,6 +68,44 @@ def get_current_user() -> Optional[Dict[str, Any]]:
     return {"id": session.user.id, "email": session.user.email}
 
 
+def _verified_user() -> Optional[Dict[str, Any]]:
+    """Ask the auth server whether the session's token is still valid; None once it has expired or been revoked"""
+    try:
+        res = get_client().auth.get_user()
+    except AuthApiError:
+        return None
+    user = getattr(res, "user", None) if res else None
+    return {"id": user.id, "email": user.email} if user else None
+
+
+def get_session_user() -> Optional[Dict[str, Any]]:
+    """get_current_user, remembered in Streamlit session state and re-verified with the auth server after a short TTL"""
+    user = st.session_state.get("_user")
+    checked_at = st.session_state.get("_user_checked_at", 0)
+    if user is not None and time.time() - checked_at < _SESSION_USER_TTL_SECONDS:
+        return user
+    if user is None:
+        user = get_current_user()
+    else:
+        try:
+            user = _verified_user()
+        except Exception:
+            # Auth server unreachable: keep the session for now and re-check on the next run
+            return user
+    if user:
+        st.session_state["_user"] = user
+        st.session_state["_user_checked_at"] = time.time()
+    else:
+        clear_session_user()
+    return user
+
+
+def clear_session_user() -> None:
+    st.session_state.pop("_user", None)
+    st.session_state.pop("_user_checked_at", None)
+    st.session_state.pop("_profile", None)
+
+
 # ---------- Users table ----------
 def upsert_user(user_id: str, *, email: str, name: str = "", timezone: str = "") -> None:
     sb = get_client()
@@ -102,6 +155,11 @@ def list_sources(*, user_id: str, workspace_id: str = None) -> List[Dict[str, An
     return res.data or []
 
 
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_list_sources(user_id: str) -> List[Dict[str, Any]]:
+    return list_sources(user_id=user_id)
+
+
 def add_source(*, user_id: str, source_type: str, source_value: str, boost_factor: float = 1.0, workspace_id: str = None) -> None:
     sb = get_client()
     data = {
@@ -127,11 +185,16 @@ def remove_source(source_id: Any) -> None:
 
 
 # ---------- Content items ----------
+# Keep each upsert request comfortably under PostgREST's body size limit
+_CONTENT_UPSERT_CHUNK_SIZE = 500
+
+
 def save_content_items(*, user_id: str, items: List[Dict[str, Any]], workspace_id: str = None) -> int:
     if not items:
         return 0
     sb = get_client()
-    rows = []
+    # One row per URL: duplicate conflict keys in a single upsert are rejected by Postgres
+    rows_by_url: Dict[Any, Dict[str, Any]] = {}
     for it in items:
         row = {
             "user_id": user_id,
@@ -142,26 +205,37 @@ def save_content_items(*, user_id: str, items: List[Dict[str, Any]], workspace_i
         }
         if workspace_id:
             row["workspace_id"] = workspace_id
-        rows.append(row)
-    # Attempt upsert; if not supported in client version, fallback to insert
-    try:
-        sb.table("content_items").upsert(rows).execute()
-    except Exception:
-        for r in rows:
-            try:
-                sb.table("content_items").insert(r).execute()
-            except Exception:
-                pass
+        rows_by_url.setdefault(row["url"], row)
+    rows = list(rows_by_url.values())
+    for start in range(0, len(rows), _CONTENT_UPSERT_CHUNK_SIZE):
+        chunk = rows[start:start + _CONTENT_UPSERT_CHUNK_SIZE]
+        # Attempt bulk upsert; if not supported in client version, fallback to insert
+        try:
+            sb.table("content_items").upsert(chunk, on_conflict="user_id,url", returning=ReturnMethod.minimal).execute()
+        except Exception:
+            for r in chunk:
+                try:
+                    sb.table("content_items").insert(r).execute()
+                except Exception:
+                    pass
     return len(rows)
 
 
-def list_recent_content(*, user_id: str, workspace_id: str = None, limit: int = 50) -> List[Dict[str, Any]]:
+def list_recent_content(*, user_id: str, workspace_id: str = None, limit: int = 50, order: str = "created_at") -> List[Dict[str, Any]]:
+    """The `limit` most recent items, newest first or re-ordered by `order` ("title_length" or "random")"""
     sb = get_client()
+    if order != "created_at":
+        # Same recent window, re-ordered server-side
+        res = sb.rpc(
+            "list_recent_content_ordered",
+            {"p_user": user_id, "p_ws": workspace_id, "p_limit": limit, "p_order": order},
+        ).execute()
+        return res.data or []
     query = (
         sb.table("content_items")
         .select("id,title,url,summary,created_at")
         .eq("user_id", user_id)
-        .order("created_at", desc=True)
+        .order(order, desc=True)
         .limit(limit)
     )
     
@@ -173,14 +247,17 @@ def list_recent_content(*, user_id: str, workspace_id: str = None, limit: int =
 
 
 # ---------- Drafts ----------
-def save_draft(user_id: str, draft_text: str, feedback: Optional[str] = None) -> None:
+def save_draft(user_id: str, draft_text: str, feedback: Optional[str] = None, draft_html: Optional[str] = None) -> None:
     sb = get_client()
-    sb.table("drafts").insert({
+    row = {
         "user_id": user_id,
         "draft_text": draft_text,
         "feedback": feedback,
         "sent": False,
-    }).execute()
+    }
+    if draft_html is not None:
+        row["draft_html"] = draft_html
+    sb.table("drafts").insert(row).execute()
 
 
 def get_latest_draft(*, user_id: str) -> Optional[Dict[str, Any]]:
@@ -203,18 +280,36 @@ def save_draft_feedback(user_id: str, draft_text: str, *, feedback: str) -> None
     sb.table("drafts").update({"feedback": feedback}).eq("user_id", user_id).eq("draft_text", draft_text).execute()
 
 
-def mark_latest_draft_sent(*, user_id: str) -> None:
+def get_latest_draft_for_send(*, user_id: str) -> Optional[Dict[str, Any]]:
+    """Latest draft's id with its stored HTML, so sending skips re-rendering the markdown"""
+    sb = get_client()
+    res = (
+        sb.table("drafts")
+        .select("id,draft_text,draft_html")
+        .eq("user_id", user_id)
+        .order("created_at", desc=True)
+        .limit(1)
+        .execute()
+    )
+    return res.data[0] if res.data else None
+
+
+def mark_draft_sent(*, draft_id: int) -> None:
     sb = get_client()
+    sb.table("drafts").update({"sent": True}).eq("id", draft_id).execute()
+
+
+def mark_latest_draft_sent(*, user_id: str) -> None:
     latest = get_latest_draft(user_id=user_id)
     if latest:
-        sb.table("drafts").update({"sent": True}).eq("id", latest["id"]).execute()
+        mark_draft_sent(draft_id=latest["id"])
 
 
 def list_drafts(*, user_id: str, limit: int = 20, search: str = "") -> List[Dict[str, Any]]:
     sb = get_client()
     q = (
         sb.table("drafts")
-        .select("id,user_id,draft_text,feedback,sent,created_at")
+        .select("id,user_id,feedback,sent,created_at")
         .eq("user_id", user_id)
         .order("created_at", desc=True)
         .limit(limit)
@@ -226,6 +321,29 @@ def list_drafts(*, user_id: str, limit: int = 20, search: str = "") -> List[Dict
     return res.data or []
 
 
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_list_recent_content(user_id: str, workspace_id: str = None, limit: int = 50, order: str = "created_at") -> List[Dict[str, Any]]:
+    return list_recent_content(user_id=user_id, workspace_id=workspace_id, limit=limit, order=order)
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_latest_draft(user_id: str) -> Optional[Dict[str, Any]]:
+    return get_latest_draft(user_id=user_id)
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_list_drafts(user_id: str, limit: int = 20, search: str = "") -> List[Dict[str, Any]]:
+    return list_drafts(user_id=user_id, limit=limit, search=search)
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def get_draft_body(draft_id: int) -> Dict[str, Any]:
+    """Fetch a draft's text and rendered HTML; list_drafts omits them"""
+    sb = get_client()
+    res = sb.table("drafts").select("draft_text,draft_html").eq("id", draft_id).single().execute()
+    return res.data if getattr(res, "data", None) else {}
+
+
 def get_draft_by_id(*, draft_id: int) -> Optional[Dict[str, Any]]:
     sb = get_client()
     res = sb.table("drafts").select("id,user_id,draft_text,feedback,sent,created_at").eq("id", draft_id).single().execute()
@@ -244,6 +362,20 @@ def save_draft_edit(*, user_id: str, original_draft_id: int | None, original_tex
     }).execute()
 
 
+# ---------- Dashboard ----------
+def get_dashboard_bootstrap(*, user_id: str, workspace_id: str) -> Dict[str, Any]:
+    """Fetch workspace role, recent content, recent drafts and the latest draft in one RPC"""
+    sb = get_client()
+    res = sb.rpc("get_dashboard_bootstrap", {"p_user": user_id, "p_ws": workspace_id}).execute()
+    data = res.data or {}
+    return {
+        "role": data.get("role"),
+        "items": data.get("items") or [],
+        "drafts": data.get("drafts") or [],
+        "latest_draft": data.get("latest_draft"),
+    }
+
+
 # ---------- Analytics & Reporting ----------
 def get_analytics_events(*, workspace_id: str, event_type: str = None, days: int = 30, limit: int = 100) -> List[Dict[str, Any]]:
     from datetime import datetime, timedelta
@@ -267,6 +399,62 @@ def get_analytics_events(*, workspace_id: str, event_type: str = None, days: int
     return res.data or []
 
 
+def get_analytics_overview(*, workspace_id: str, days: int = 30, recent_limit: int = 20) -> Dict[str, Any]:
+    """Usage summary, cost breakdown and recent events for the Overview tab, in one RPC"""
+    from datetime import datetime, timedelta
+    
+    sb = get_client()
+    cutoff_date = (datetime.utcnow() - timedelta(days=days)).isoformat()
+    res = sb.rpc("get_analytics_overview", {"p_ws": workspace_id, "p_since": cutoff_date, "p_recent_limit": recent_limit}).execute()
+    data = res.data or {}
+    
+    # Same shapes as AnalyticsReporter.get_usage_summary / get_cost_breakdown
+    counts = data.get("event_counts") or {}
+    total_cost = int(data.get("total_cost_cents") or 0)
+    storage_bytes = int(data.get("storage_bytes") or 0)
+    cost_by_type = data.get("cost_by_event_type") or {}
+    breakdown_total = sum(cost_by_type.values())
+    return {
+        "usage_summary": {
+            "period_days": days,
+            "total_events": int(data.get("total_events") or 0),
+            "total_cost_cents": total_cost,
+            "total_cost_dollars": total_cost / 100,
+            "api_calls": {
+                "total": counts.get("api_call", 0),
+                "by_provider": data.get("api_calls_by_provider") or {}
+            },
+            "storage": {
+                "uploads": counts.get("storage_upload", 0),
+                "total_bytes": storage_bytes,
+                "total_mb": storage_bytes / 1024 / 1024
+            },
+            "emails": {
+                "sent": counts.get("email_sent", 0),
+                "recipients": int(data.get("email_recipients") or 0)
+            },
+            "content": {
+                "source_fetches": counts.get("source_fetch", 0),
+                "items_fetched": int(data.get("items_fetched") or 0),
+                "draft_generations": counts.get("draft_generate", 0)
+            }
+        },
+        "cost_breakdown": {
+            "total_cost_cents": breakdown_total,
+            "total_cost_dollars": breakdown_total / 100,
+            "by_event_type": cost_by_type,
+            "by_category": data.get("cost_by_category") or {},
+            "period_days": days
+        },
+        "recent_events": data.get("recent_events") or [],
+    }
+
+
+@st.cache_data(ttl=300, max_entries=128, show_spinner=False)
+def cached_analytics_overview(workspace_id: str, days: int = 30, recent_limit: int = 20) -> Dict[str, Any]:
+    return get_analytics_overview(workspace_id=workspace_id, days=days, recent_limit=recent_limit)
+
+
 def get_analytics_reports(*, workspace_id: str, report_type: str = None, limit: int = 20) -> List[Dict[str, Any]]:
     sb = get_client()
     query = (
@@ -284,6 +472,11 @@ def get_analytics_reports(*, workspace_id: str, report_type: str = None, limit:
     return res.data or []
 
 
+@st.cache_data(ttl=300, max_entries=128, show_spinner=False)
+def cached_analytics_reports(workspace_id: str, limit: int = 20) -> List[Dict[str, Any]]:
+    return get_analytics_reports(workspace_id=workspace_id, limit=limit)
+
+
 def create_analytics_dashboard(*, workspace_id: str, dashboard_name: str, dashboard_config: Dict[str, Any], created_by: str, is_default: bool = False) -> Dict[str, Any]:
     sb = get_client()
     res = sb.table("analytics_dashboards").insert({
@@ -308,6 +501,11 @@ def get_analytics_dashboards(*, workspace_id: str) -> List[Dict[str, Any]]:
     return res.data or []
 
 
+@st.cache_data(ttl=300, max_entries=128, show_spinner=False)
+def cached_analytics_dashboards(workspace_id: str) -> List[Dict[str, Any]]:
+    return get_analytics_dashboards(workspace_id=workspace_id)
+
+
 def update_analytics_dashboard(*, dashboard_id: int, dashboard_name: str = None, dashboard_config: Dict[str, Any] = None) -> None:
     sb = get_client()
     update_data = {}
@@ -401,6 +599,45 @@ def get_usage_trends(*, workspace_id: str, event_type: str, days: int = 30) -> L
     return sorted(trends, key=lambda x: x["date"])
 
 
+def get_cost_trends_with_summary(*, workspace_id: str, days: int = 30) -> Dict[str, Any]:
+    """Daily cost points bucketed in SQL, with total/mean/max already computed, in one RPC"""
+    sb = get_client()
+    res = sb.rpc("get_cost_trends_with_summary", {"p_ws": workspace_id, "p_days": days}).execute()
+    data = res.data or {}
+    return {
+        "points": [
+            {"date": p["date"], "cost_cents": p["cost_cents"], "cost_dollars": p["cost_cents"] / 100}
+            for p in data.get("points") or []
+        ],
+        "total_dollars": float(data.get("total_cents") or 0) / 100,
+        "mean_dollars": float(data.get("mean_cents") or 0) / 100,
+        "max_dollars": float(data.get("max_cents") or 0) / 100,
+    }
+
+
+@st.cache_data(ttl=300, max_entries=128, show_spinner=False)
+def cached_cost_trends_with_summary(workspace_id: str, days: int = 30) -> Dict[str, Any]:
+    return get_cost_trends_with_summary(workspace_id=workspace_id, days=days)
+
+
+def get_usage_trends_with_summary(*, workspace_id: str, event_type: str, days: int = 30) -> Dict[str, Any]:
+    """Daily event counts bucketed in SQL, with total/mean/max already computed, in one RPC"""
+    sb = get_client()
+    res = sb.rpc("get_usage_trends_with_summary", {"p_ws": workspace_id, "p_event_type": event_type, "p_days": days}).execute()
+    data = res.data or {}
+    return {
+        "points": data.get("points") or [],
+        "total": int(data.get("total") or 0),
+        "mean": float(data.get("mean") or 0),
+        "max": int(data.get("max") or 0),
+    }
+
+
+@st.cache_data(ttl=300, max_entries=128, show_spinner=False)
+def cached_usage_trends_with_summary(workspace_id: str, event_type: str, days: int = 30) -> Dict[str, Any]:
+    return get_usage_trends_with_summary(workspace_id=workspace_id, event_type=event_type, days=days)
+
+
 # ---------- Agency Dashboard ----------
 def create_client_profile(*, workspace_id: str, client_name: str, client_email: str = None, client_website: str = None, industry: str = None, contact_person: str = None, notes: str = None) -> Dict[str, Any]:
     sb = get_client()
@@ -418,10 +655,22 @@ def create_client_profile(*, workspace_id: str, client_name: str, client_email:
 
 def get_client_profiles(*, workspace_id: str) -> List[Dict[str, Any]]:
     sb = get_client()
-    res = sb.table("client_profiles").select("*").eq("workspace_id", workspace_id).order("created_at", desc=True).execute()
+    res = (
+        sb.table("client_profiles")
+        # Everything the client list shows, in one query; skips the branding/settings blobs
+        .select("id, client_name, client_email, client_website, industry, contact_person, notes, created_at, updated_at")
+        .eq("workspace_id", workspace_id)
+        .order("created_at", desc=True)
+        .execute()
+    )
     return res.data or []
 
 
+@st.cache_data(ttl=30, show_spinner=False)
+def cached_client_profiles(workspace_id: str) -> List[Dict[str, Any]]:
+    return get_client_profiles(workspace_id=workspace_id)
+
+
 def update_client_profile(*, client_id: str, **updates) -> None:
     sb = get_client()
     sb.table("client_profiles").update(updates).eq("id", client_id).execute()
@@ -468,7 +717,8 @@ def get_bulk_operations(*, workspace_id: str, limit: int = 20) -> List[Dict[str,
     sb = get_client()
     res = (
         sb.table("bulk_operations")
-        .select("*, users(email, name)")
+        # Only the columns the dashboard shows, with the creator embedded via the created_by FK
+        .select("id, operation_type, status, created_at, target_workspaces, progress, results, error_message, users!created_by(name)")
         .eq("workspace_id", workspace_id)
         .order("created_at", desc=True)
         .limit(limit)
@@ -477,6 +727,44 @@ def get_bulk_operations(*, workspace_id: str, limit: int = 20) -> List[Dict[str,
     return res.data or []
 
 
+def fail_stale_bulk_operations(*, workspace_id: str, stale_after_minutes: int) -> None:
+    """Mark pending or running operations older than the cutoff as failed; their runner is gone (e.g. a restart)"""
+    from datetime import datetime, timedelta
+    
+    sb = get_client()
+    cutoff = (datetime.utcnow() - timedelta(minutes=stale_after_minutes)).isoformat()
+    (
+        sb.table("bulk_operations")
+        .update({"status": "failed", "error_message": "Interrupted before finishing", "completed_at": "now()"})
+        .eq("workspace_id", workspace_id)
+        .in_("status", ["pending", "running"])
+        .lt("created_at", cutoff)
+        .execute()
+    )
+
+
+def count_active_bulk_operations(*, workspace_id: str, stale_after_minutes: int) -> int:
+    """Pending or running bulk operations newer than the cutoff for a workspace, as a head-only count"""
+    from datetime import datetime, timedelta
+    
+    sb = get_client()
+    cutoff = (datetime.utcnow() - timedelta(minutes=stale_after_minutes)).isoformat()
+    res = (
+        sb.table("bulk_operations")
+        .select("id", count="exact", head=True)
+        .eq("workspace_id", workspace_id)
+        .in_("status", ["pending", "running"])
+        .gte("created_at", cutoff)
+        .execute()
+    )
+    return res.count or 0
+
+
+@st.cache_data(ttl=15, show_spinner=False)
+def cached_bulk_operations(workspace_id: str, limit: int = 20) -> List[Dict[str, Any]]:
+    return get_bulk_operations(workspace_id=workspace_id, limit=limit)
+
+
 def update_bulk_operation_status(*, operation_id: int, status: str, progress: Dict[str, Any] = None, results: Dict[str, Any] = None, error_message: str = None) -> None:
     sb = get_client()
     update_data = {"status": status}
@@ -496,6 +784,12 @@ def update_bulk_operation_status(*, operation_id: int, status: str, progress: Di
     sb.table("bulk_operations").update(update_data).eq("id", operation_id).execute()
 
 
+def update_bulk_operation_progress(*, operation_id: int, progress: Dict[str, Any]) -> None:
+    """Write only the progress counters; a single UPDATE with no status or timestamp changes"""
+    sb = get_client()
+    sb.table("bulk_operations").update({"progress": progress}).eq("id", operation_id).execute()
+
+
 def get_workspace_analytics(*, workspace_id: str, days: int = 30) -> Dict[str, Any]:
     """Get analytics for a specific workspace"""
     from datetime import datetime, timedelta
@@ -503,27 +797,21 @@ def get_workspace_analytics(*, workspace_id: str, days: int = 30) -> Dict[str, A
     sb = get_client()
     cutoff_date = (datetime.utcnow() - timedelta(days=days)).isoformat()
     
-    # Get newsletters sent
-    newsletters_res = (
+    # Newsletters sent, sources, team members and drafts are independent reads
+    newsletters_res, sources_res, members_res, drafts_res = gather_reads(
         sb.table("usage_tracking")
         .select("metric_value")
         .eq("workspace_id", workspace_id)
         .eq("metric_type", "newsletter_sent")
         .gte("created_at", cutoff_date)
-        .execute()
+        .execute,
+        sb.table("user_sources").select("id").eq("workspace_id", workspace_id).execute,
+        sb.table("workspace_members").select("id").eq("workspace_id", workspace_id).execute,
+        sb.table("drafts").select("id").eq("workspace_id", workspace_id).gte("created_at", cutoff_date).execute,
     )
     newsletters_sent = sum(float(item["metric_value"]) for item in (newsletters_res.data or []))
-    
-    # Get sources count
-    sources_res = sb.table("user_sources").select("id").eq("workspace_id", workspace_id).execute()
     sources_count = len(sources_res.data or [])
-    
-    # Get team members count
-    members_res = sb.table("workspace_members").select("id").eq("workspace_id", workspace_id).execute()
     members_count = len(members_res.data or [])
-    
-    # Get drafts count
-    drafts_res = sb.table("drafts").select("id").eq("workspace_id", workspace_id).gte("created_at", cutoff_date).execute()
     drafts_count = len(drafts_res.data or [])
     
     return {
@@ -535,6 +823,39 @@ def get_workspace_analytics(*, workspace_id: str, days: int = 30) -> Dict[str, A
     }
 
 
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_workspace_analytics(workspace_id: str, days: int = 30) -> Dict[str, Any]:
+    return get_workspace_analytics(workspace_id=workspace_id, days=days)
+
+
+def get_workspace_metrics_bulk(*, workspace_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """30-day workspace metrics from the hourly materialized view; can trail get_workspace_analytics by up to an hour"""
+    metrics = {
+        ws_id: {"newsletters_sent": 0.0, "sources_count": 0, "members_count": 0, "drafts_count": 0, "period_days": 30}
+        for ws_id in workspace_ids
+    }
+    if not workspace_ids:
+        return metrics
+    
+    sb = get_client()
+    # The view is private (no RLS on materialized views); the RPC returns only workspaces the caller belongs to,
+    # so any others keep their zeroed defaults
+    res = sb.rpc("get_workspace_metrics_30d", {"p_workspace_ids": workspace_ids}).execute()
+    for row in res.data or []:
+        metrics[row["workspace_id"]].update(
+            newsletters_sent=float(row["newsletters_sent"]),
+            sources_count=row["sources_count"],
+            members_count=row["members_count"],
+            drafts_count=row["drafts_count"],
+        )
+    return metrics
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def cached_workspace_metrics_bulk(workspace_ids: tuple) -> Dict[str, Dict[str, Any]]:
+    return get_workspace_metrics_bulk(workspace_ids=list(workspace_ids))
+
+
 # ---------- Billing & Subscriptions ----------
 def get_subscription_plans() -> List[Dict[str, Any]]:
     sb = get_client()
@@ -542,6 +863,11 @@ def get_subscription_plans() -> List[Dict[str, Any]]:
     return res.data or []
 
 
+@st.cache_data(ttl=3600, max_entries=1, show_spinner=False)
+def cached_subscription_plans() -> List[Dict[str, Any]]:
+    return get_subscription_plans()
+
+
 def get_user_subscription(*, user_id: str) -> Optional[Dict[str, Any]]:
     sb = get_client()
     res = (
@@ -572,6 +898,19 @@ def create_user_subscription(*, user_id: str, plan_id: str, stripe_customer_id:
     return res.data[0]
 
 
+def get_stripe_customer_id(*, user_id: str) -> Optional[str]:
+    """Stripe customer saved on the user row, if one has been created"""
+    sb = get_client()
+    res = sb.table("users").select("stripe_customer_id").eq("id", user_id).limit(1).execute()
+    return res.data[0].get("stripe_customer_id") if res.data else None
+
+
+def save_stripe_customer_id(*, user_id: str, stripe_customer_id: str) -> None:
+    """Remember the user's Stripe customer on the users row, which free-plan users have too"""
+    sb = get_client()
+    sb.table("users").update({"stripe_customer_id": stripe_customer_id}).eq("id", user_id).execute()
+
+
 def update_subscription_status(*, subscription_id: str, status: str, current_period_start: str = None, current_period_end: str = None) -> None:
     sb = get_client()
     update_data = {"status": status}
@@ -615,6 +954,27 @@ def get_usage_for_period(*, user_id: str, metric_type: str, days: int = 30) -> i
     return sum(float(item["metric_value"]) for item in (res.data or []))
 
 
+def get_usage_summary(*, user_id: str, days: int = 30) -> Dict[str, Any]:
+    """Newsletter/API usage for the period plus workspace and source counts, in one RPC"""
+    from datetime import datetime, timedelta
+    
+    sb = get_client()
+    cutoff_date = (datetime.utcnow() - timedelta(days=days)).isoformat()
+    res = sb.rpc("get_usage_summary", {"p_user": user_id, "p_since": cutoff_date}).execute()
+    data = res.data or {}
+    return {
+        "newsletters": float(data.get("newsletters") or 0),
+        "api_calls": float(data.get("api_calls") or 0),
+        "workspaces": int(data.get("workspaces") or 0),
+        "sources": int(data.get("sources") or 0),
+    }
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def cached_usage_summary(user_id: str, days: int = 30) -> Dict[str, Any]:
+    return get_usage_summary(user_id=user_id, days=days)
+
+
 def check_usage_limit(*, user_id: str, metric_type: str, limit: int) -> bool:
     """Check if user has exceeded usage limit for a metric"""
     current_usage = get_usage_for_period(user_id=user_id, metric_type=metric_type)
@@ -638,6 +998,17 @@ def get_user_plan_limits(*, user_id: str) -> Dict[str, Any]:
     return limits
 
 
+@st.cache_data(ttl=60, max_entries=500, show_spinner=False)
+def cached_user_plan_limits(user_id: str) -> Dict[str, Any]:
+    return get_user_plan_limits(user_id=user_id)
+
+
+@st.cache_data(ttl=300, max_entries=500, show_spinner=False)
+def cached_user_plan_id(user_id: str) -> str:
+    subscription = get_user_subscription(user_id=user_id)
+    return subscription.get("plan_id", "free") if subscription else "free"
+
+
 # ---------- Workspaces ----------
 def create_workspace(*, name: str, slug: str, description: str = "", owner_id: str) -> Dict[str, Any]:
     sb = get_client()
@@ -674,17 +1045,37 @@ def get_user_workspaces(*, user_id: str) -> List[Dict[str, Any]]:
     return res.data or []
 
 
-def get_workspace_members(*, workspace_id: str) -> List[Dict[str, Any]]:
+@st.cache_data(ttl=60, max_entries=500, show_spinner=False)
+def cached_user_workspaces(user_id: str) -> List[Dict[str, Any]]:
+    return get_user_workspaces(user_id=user_id)
+
+
+def get_workspace_members(*, workspace_id: str, limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
+    """Workspace members in id order; pass `limit` to fetch a single page starting at `offset`"""
     sb = get_client()
-    res = (
+    query = (
         sb.table("workspace_members")
         .select("id, user_id, role, invited_at, joined_at, users!workspace_members_user_id_fkey(email, name)")
         .eq("workspace_id", workspace_id)
-        .execute()
+        .order("id")
     )
+    if limit is not None:
+        query = query.range(offset, offset + limit - 1)
+    res = query.execute()
     return res.data or []
 
 
+def count_workspace_members(*, workspace_id: str) -> int:
+    sb = get_client()
+    res = sb.table("workspace_members").select("id", count="exact", head=True).eq("workspace_id", workspace_id).execute()
+    return res.count or 0
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def cached_workspace_member_count(workspace_id: str) -> int:
+    return count_workspace_members(workspace_id=workspace_id)
+
+
 def invite_user_to_workspace(*, workspace_id: str, email: str, role: str, invited_by: str) -> None:
     sb = get_client()
     
@@ -728,54 +1119,33 @@ def get_user_workspace_role(*, user_id: str, workspace_id: str) -> Optional[str]
 
 
 # ---------- Analytics ----------
-def get_email_analytics(*, user_id: str, days: int = 30) -> Dict[str, Any]:
+def get_email_analytics(*, user_id: str, days: int = 30, top: int = 10) -> Dict[str, Any]:
+    """Open/click/sent counts and the `top` most clicked URLs, aggregated server-side"""
     from datetime import datetime, timedelta
     
     sb = get_client()
     cutoff_date = (datetime.utcnow() - timedelta(days=days)).isoformat()
+    res = sb.rpc("get_email_analytics", {"p_user": user_id, "p_since": cutoff_date, "p_top": top}).execute()
+    data = res.data or {}
     
-    # Get opens
-    opens_res = (
-        sb.table("email_events")
-        .select("id,created_at")
-        .eq("user_id", user_id)
-        .eq("event_type", "open")
-        .gte("created_at", cutoff_date)
-        .execute()
-    )
-    opens = opens_res.data or []
-    
-    # Get clicks
-    clicks_res = (
-        sb.table("link_clicks")
-        .select("id,url,created_at")
-        .eq("user_id", user_id)
-        .gte("created_at", cutoff_date)
-        .execute()
-    )
-    clicks = clicks_res.data or []
-    
-    # Get sent emails
-    sent_res = (
-        sb.table("drafts")
-        .select("id,created_at")
-        .eq("user_id", user_id)
-        .eq("sent", True)
-        .gte("created_at", cutoff_date)
-        .execute()
-    )
-    sent = sent_res.data or []
-    
+    opens = data.get("opens") or 0
+    clicks = data.get("clicks") or 0
+    sent = data.get("sent") or 0
     return {
-        "opens": len(opens),
-        "clicks": len(clicks),
-        "sent": len(sent),
-        "open_rate": len(opens) / len(sent) if sent else 0,
-        "ctr": len(clicks) / len(opens) if opens else 0,
-        "clicks_by_url": {url: sum(1 for c in clicks if c["url"] == url) for url in set(c["url"] for c in clicks)},
+        "opens": opens,
+        "clicks": clicks,
+        "sent": sent,
+        "open_rate": opens / sent if sent else 0,
+        "ctr": clicks / opens if opens else 0,
+        "top_clicks": [(row["url"], row["clicks"]) for row in data.get("top_clicks") or []],
     }
 
 
+@st.cache_data(ttl=300, show_spinner=False)
+def cached_email_analytics(user_id: str, days: int = 30) -> Dict[str, Any]:
+    return get_email_analytics(user_id=user_id, days=days)
+
+
 # ---------- Storage for style files ----------
 def upload_style_file(*, user_id: str, filename: str, data: bytes) -> None:
     sb = get_client()
@@ -783,6 +1153,19 @@ def upload_style_file(*, user_id: str, filename: str, data: bytes) -> None:
     sb.storage.from_(_STYLE_BUCKET).upload(path, data)
 
 
+async def _upload_style_files_async(user_id: str, files: List[tuple[str, bytes]]) -> List[Optional[BaseException]]:
+    results = await asyncio.gather(
+        *(asyncio.to_thread(upload_style_file, user_id=user_id, filename=name, data=data) for name, data in files),
+        return_exceptions=True,
+    )
+    return [r if isinstance(r, BaseException) else None for r in results]
+
+
+def upload_style_files(*, user_id: str, files: List[tuple[str, bytes]]) -> List[Optional[BaseException]]:
+    """Upload (filename, data) pairs concurrently; returns None or the error for each file, in order"""
+    return asyncio.run(_upload_style_files_async(user_id, files))
+
+
 def list_style_files(*, user_id: str) -> List[Dict[str, Any]]:
     sb = get_client()
     path = f"{user_id}"
@@ -806,6 +1189,11 @@ def list_style_files(*, user_id: str) -> List[Dict[str, Any]]:
         return []
 
 
+@st.cache_data(ttl=120, show_spinner=False)
+def cached_list_style_files(user_id: str) -> List[Dict[str, Any]]:
+    return list_style_files(user_id=user_id) or []
+
+
 def download_style_file(*, user_id: str, filename: str) -> Optional[bytes]:
     sb = get_client()
     path = f"{user_id}/{filename}"
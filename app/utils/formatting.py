@@ -1,14 +1,36 @@
 from typing import Optional
 import difflib
+import threading
+from functools import lru_cache
 
 
+try:
+    import markdown  # type: ignore
+except Exception:
+    markdown = None
+
+# Markdown instances are reusable after reset() but not thread-safe, and drafts
+# are rendered from bulk-operation worker threads, so keep one per thread.
+_md_local = threading.local()
+
+
+def _get_markdown():
+    md = getattr(_md_local, "md", None)
+    if md is None:
+        md = markdown.Markdown(extensions=["extra", "sane_lists"])  # type: ignore
+        _md_local.md = md
+    return md
+
+
+# Same draft is often rendered repeatedly (send, resend, save); strings are hashable and the output is pure
+@lru_cache(maxsize=64)
 def markdown_to_html(md_text: str) -> str:
-    try:
-        import markdown  # type: ignore
-    except Exception:
+    if markdown is None:
         # Minimal fallback: wrap in <pre>
         return f"<pre>{md_text}</pre>"
-    return markdown.markdown(md_text, extensions=["extra", "sane_lists"])  # type: ignore
+    md = _get_markdown()
+    md.reset()
+    return md.convert(md_text)
 
 
 def inject_tracking(html: str, *, user_id: str | None = None, draft_id: int | None = None, api_url: str | None = None) -> str:
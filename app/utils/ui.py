@@ -235,6 +235,16 @@ def section_header(title: str, subtitle: str = ""):
         st.markdown(f"<span class='cp-muted'>{subtitle}</span>", unsafe_allow_html=True)
 
 
+def show_flash(key: str):
+    # Messages set by callbacks, shown on the run that follows them:
+    # one (level, text) tuple or a list of them, level being an st function name
+    flash = st.session_state.pop(key, None)
+    if not flash:
+        return
+    for level, text in [flash] if isinstance(flash, tuple) else flash:
+        getattr(st, level)(text)
+
+
 def metric_card(value: str, label: str, delta: str = None):
     """Create a modern metric card with optional delta indicator"""
     delta_html = f'<div style="color: #10B981; font-size: 0.8rem; margin-top: 0.25rem;">{delta}</div>' if delta else ""
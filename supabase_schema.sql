@@ -280,3 +280,300 @@ do $$ begin
   end if;
 end $$;
 
+
+-- Pre-rendered HTML for drafts so resends skip markdown parsing
+alter table if exists public.drafts
+  add column if not exists draft_html text;
+
+-- Dashboard bootstrap: role, recent content, drafts and the latest draft in a single round-trip
+create or replace function public.get_dashboard_bootstrap(p_user uuid, p_ws uuid)
+returns json
+language sql
+stable
+as $$
+  select json_build_object(
+    'role', (
+      select wm.role from public.workspace_members wm
+      where wm.user_id = p_user and wm.workspace_id = p_ws and wm.joined_at is not null
+      limit 1
+    ),
+    'items', coalesce((
+      select json_agg(c) from (
+        select id, title, url, summary, created_at from public.content_items
+        where user_id = p_user and workspace_id = p_ws
+        order by created_at desc
+        limit 50
+      ) c
+    ), '[]'::json),
+    'drafts', coalesce((
+      select json_agg(d) from (
+        select id, user_id, feedback, sent, created_at from public.drafts
+        where user_id = p_user
+        order by created_at desc
+        limit 10
+      ) d
+    ), '[]'::json),
+    'latest_draft', (
+      select row_to_json(l) from (
+        select id, user_id, draft_text, feedback, sent, created_at from public.drafts
+        where user_id = p_user
+        order by created_at desc
+        limit 1
+      ) l
+    )
+  );
+$$;
+
+-- Trigram index so the draft search (ilike '%q%') doesn't scan every draft
+create extension if not exists pg_trgm;
+create index if not exists idx_drafts_text_trgm on public.drafts using gin (draft_text gin_trgm_ops);
+
+-- Dashboard "Title length" and "Random" views: re-order the most recent p_limit items in Postgres,
+-- so the set shown is the same as Recency and only the order changes
+alter table if exists public.content_items
+  add column if not exists title_length int generated always as (char_length(coalesce(title, ''))) stored;
+drop index if exists public.idx_content_user_title_length;
+create or replace function public.list_recent_content_ordered(p_user uuid, p_ws uuid, p_limit int, p_order text)
+returns table (id bigint, title text, url text, summary text, created_at timestamptz)
+language sql
+volatile
+as $$
+  select r.id, r.title, r.url, r.summary, r.created_at
+  from (
+    select c.id, c.title, c.url, c.summary, c.created_at, c.title_length
+    from public.content_items c
+    where c.user_id = p_user and (p_ws is null or c.workspace_id = p_ws)
+    order by c.created_at desc
+    limit p_limit
+  ) r
+  order by
+    case when p_order = 'title_length' then r.title_length end desc,
+    case when p_order = 'random' then random() end;
+$$;
+
+-- Email analytics in one round-trip: counts plus the top clicked URLs, aggregated in Postgres
+create or replace function public.get_email_analytics(p_user uuid, p_since timestamptz, p_top int default 10)
+returns json
+language sql
+stable
+as $$
+  select json_build_object(
+    'opens', (
+      select count(*) from public.email_events
+      where user_id = p_user and event_type = 'open' and created_at >= p_since
+    ),
+    'clicks', (
+      select count(*) from public.link_clicks
+      where user_id = p_user and created_at >= p_since
+    ),
+    'sent', (
+      select count(*) from public.drafts
+      where user_id = p_user and sent and created_at >= p_since
+    ),
+    'top_clicks', coalesce((
+      select json_agg(t) from (
+        select url, count(*) as clicks from public.link_clicks
+        where user_id = p_user and created_at >= p_since
+        group by url
+        order by clicks desc
+        limit p_top
+      ) t
+    ), '[]'::json)
+  );
+$$;
+
+-- Billing usage counters in one round-trip
+create or replace function public.get_usage_summary(p_user uuid, p_since timestamptz)
+returns json
+language sql
+stable
+as $$
+  select json_build_object(
+    'newsletters', (
+      select coalesce(sum(metric_value), 0) from public.usage_tracking
+      where user_id = p_user and metric_type = 'newsletter_sent' and created_at >= p_since
+    ),
+    'api_calls', (
+      select coalesce(sum(metric_value), 0) from public.usage_tracking
+      where user_id = p_user and metric_type = 'api_call' and created_at >= p_since
+    ),
+    'workspaces', (
+      select count(*) from public.workspace_members
+      where user_id = p_user and joined_at is not null
+    ),
+    'sources', (
+      select count(*) from public.user_sources
+      where user_id = p_user
+    )
+  );
+$$;
+
+-- Client list reads filter by workspace and sort newest first
+create index if not exists idx_client_profiles_workspace_created on public.client_profiles(workspace_id, created_at desc);
+
+-- Per-workspace 30-day metrics for the Agency Dashboard, aggregated in SQL and refreshed hourly.
+-- Materialized views have no RLS, so it lives in a schema PostgREST does not expose and is read
+-- only through get_workspace_metrics_30d below, which filters to the caller's workspaces
+create schema if not exists private;
+revoke all on schema private from public, anon, authenticated;
+alter materialized view if exists public.v_workspace_metrics_30d set schema private;
+create materialized view if not exists private.v_workspace_metrics_30d as
+select
+  w.id as workspace_id,
+  coalesce((
+    select sum(u.metric_value) from public.usage_tracking u
+    where u.workspace_id = w.id and u.metric_type = 'newsletter_sent' and u.created_at >= now() - interval '30 days'
+  ), 0) as newsletters_sent,
+  (select count(*) from public.user_sources s where s.workspace_id = w.id) as sources_count,
+  (select count(*) from public.workspace_members m where m.workspace_id = w.id) as members_count,
+  (
+    select count(*) from public.drafts d
+    where d.workspace_id = w.id and d.created_at >= now() - interval '30 days'
+  ) as drafts_count
+from public.workspaces w;
+-- Unique index lets the hourly refresh run concurrently without blocking readers
+create unique index if not exists idx_v_workspace_metrics_30d_workspace on private.v_workspace_metrics_30d(workspace_id);
+create extension if not exists pg_cron;
+select cron.schedule(
+  'refresh_v_workspace_metrics_30d',
+  '0 * * * *',
+  $$refresh materialized view concurrently private.v_workspace_metrics_30d$$
+);
+
+create or replace function public.get_workspace_metrics_30d(p_workspace_ids uuid[])
+returns setof private.v_workspace_metrics_30d
+language sql
+stable
+security definer
+set search_path = ''
+as $$
+  select v.*
+  from private.v_workspace_metrics_30d v
+  where v.workspace_id = any(p_workspace_ids)
+    and (
+      auth.role() = 'service_role'
+      or exists (
+        select 1 from public.workspace_members m
+        where m.workspace_id = v.workspace_id and m.user_id = auth.uid()
+      )
+    );
+$$;
+revoke all on function public.get_workspace_metrics_30d(uuid[]) from public, anon;
+grant execute on function public.get_workspace_metrics_30d(uuid[]) to authenticated, service_role;
+
+-- Analytics trend charts: zero-filled daily points plus their total/mean/max in one round-trip
+create or replace function public.get_cost_trends_with_summary(p_ws uuid, p_days int)
+returns json
+language sql
+stable
+as $$
+  with days as (
+    select d::date as day
+    from generate_series((now() at time zone 'utc')::date - (p_days - 1), (now() at time zone 'utc')::date, interval '1 day') d
+  ), daily as (
+    select (created_at at time zone 'utc')::date as day, sum(cost_cents) as cost_cents
+    from public.analytics_events
+    where workspace_id = p_ws and cost_cents > 0 and created_at >= now() - make_interval(days => p_days)
+    group by 1
+  ), points as (
+    select days.day, coalesce(daily.cost_cents, 0) as cost_cents
+    from days left join daily using (day)
+  )
+  select json_build_object(
+    'total_cents', (select coalesce(sum(cost_cents), 0) from points),
+    'mean_cents', (select coalesce(avg(cost_cents), 0) from points),
+    'max_cents', (select coalesce(max(cost_cents), 0) from points),
+    'points', (select json_agg(json_build_object('date', to_char(day, 'YYYY-MM-DD'), 'cost_cents', cost_cents) order by day) from points)
+  );
+$$;
+
+create or replace function public.get_usage_trends_with_summary(p_ws uuid, p_event_type text, p_days int)
+returns json
+language sql
+stable
+as $$
+  with days as (
+    select d::date as day
+    from generate_series((now() at time zone 'utc')::date - (p_days - 1), (now() at time zone 'utc')::date, interval '1 day') d
+  ), daily as (
+    select (created_at at time zone 'utc')::date as day, count(*) as count
+    from public.analytics_events
+    where workspace_id = p_ws and event_type = p_event_type and created_at >= now() - make_interval(days => p_days)
+    group by 1
+  ), points as (
+    select days.day, coalesce(daily.count, 0) as count
+    from days left join daily using (day)
+  )
+  select json_build_object(
+    'total', (select coalesce(sum(count), 0) from points),
+    'mean', (select coalesce(avg(count), 0) from points),
+    'max', (select coalesce(max(count), 0) from points),
+    'points', (select json_agg(json_build_object('date', to_char(day, 'YYYY-MM-DD'), 'count', count) order by day) from points)
+  );
+$$;
+
+-- Analytics Overview tab: usage summary, cost breakdown and recent events from one scan of the period's events
+create or replace function public.get_analytics_overview(p_ws uuid, p_since timestamptz, p_recent_limit int default 20)
+returns json
+language sql
+stable
+as $$
+  with ev as (
+    select event_type, event_name, metadata, coalesce(cost_cents, 0) as cost_cents, created_at
+    from public.analytics_events
+    where workspace_id = p_ws and created_at >= p_since
+  )
+  select json_build_object(
+    'total_events', (select count(*) from ev),
+    'total_cost_cents', (select coalesce(sum(cost_cents), 0) from ev),
+    'event_counts', (
+      select coalesce(json_object_agg(event_type, n), '{}'::json)
+      from (select event_type, count(*) as n from ev group by 1) c
+    ),
+    'api_calls_by_provider', (
+      select coalesce(json_object_agg(provider, n), '{}'::json)
+      from (
+        select coalesce(metadata->>'api_provider', 'unknown') as provider, count(*) as n
+        from ev where event_type = 'api_call' group by 1
+      ) p
+    ),
+    'storage_bytes', (
+      select coalesce(sum((metadata->>'file_size_bytes')::bigint), 0) from ev where event_type = 'storage_upload'
+    ),
+    'email_recipients', (
+      select coalesce(sum(coalesce((metadata->>'recipient_count')::int, 1)), 0) from ev where event_type = 'email_sent'
+    ),
+    'items_fetched', (
+      select coalesce(sum((metadata->>'items_fetched')::int), 0) from ev where event_type = 'source_fetch'
+    ),
+    'cost_by_event_type', (
+      select coalesce(json_object_agg(event_type, cents), '{}'::json)
+      from (select event_type, sum(cost_cents) as cents from ev where cost_cents > 0 group by 1) t
+    ),
+    'cost_by_category', (
+      select coalesce(json_object_agg(category, cents), '{}'::json)
+      from (
+        select
+          case event_type
+            when 'api_call' then 'API Usage'
+            when 'storage_upload' then 'Storage'
+            when 'email_sent' then 'Email Delivery'
+            else 'Other'
+          end as category,
+          sum(cost_cents) as cents
+        from ev where cost_cents > 0 group by 1
+      ) g
+    ),
+    'recent_events', (
+      select coalesce(json_agg(r order by r.created_at desc), '[]'::json)
+      from (
+        select event_type, event_name, cost_cents, created_at
+        from ev order by created_at desc limit p_recent_limit
+      ) r
+    )
+  );
+$$;
+
+-- Stripe customer per user, so free-plan users reuse one customer across checkouts
+alter table if exists public.users
+  add column if not exists stripe_customer_id text;
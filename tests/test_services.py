@@ -5,6 +5,11 @@ from unittest.mock import Mock, patch
 from services.supabase_client import (
     create_workspace,
     get_user_workspaces,
+    get_cost_trends_with_summary,
+    get_analytics_overview,
+    save_content_items,
+    save_draft_feedback,
+    save_draft_edit,
     create_client_profile,
     get_client_profiles,
 )
@@ -62,7 +67,80 @@ class TestSupabaseClient:
         assert len(workspaces) == 1
         assert workspaces[0]["workspace_id"] == "workspace-123"
         assert workspaces[0]["role"] == "owner"
-
+    
+    @patch('services.supabase_client.get_client')
+    def test_session_user_rechecked_after_ttl(self, mock_get_client, mock_user_id):
+        """Test that a remembered user is re-verified once the TTL passes and dropped when revoked"""
+        from supabase import AuthApiError
+        from services import supabase_client
+        
+        session_state = {"_user": {"id": mock_user_id, "email": "a@b.c"}, "_user_checked_at": 0}
+        mock_get_client.return_value.auth.get_user.side_effect = AuthApiError("revoked", 401, "session_not_found")
+        with patch.object(supabase_client.st, "session_state", session_state):
+            assert supabase_client.get_session_user() is None
+        
+        assert "_user" not in session_state
+        mock_get_client.return_value.auth.get_user.assert_called_once()
+    
+    @patch('services.supabase_client.get_client')
+    def test_save_content_items_single_upsert(self, mock_get_client, mock_user_id):
+        """Test that fetched items are written in one deduplicated upsert"""
+        mock_client = Mock()
+        mock_get_client.return_value = mock_client
+        
+        items = [
+            {"title": "A", "url": "https://example.com/a"},
+            {"title": "A (boosted copy)", "url": "https://example.com/a"},
+            {"title": "B", "url": "https://example.com/b"},
+        ]
+        saved = save_content_items(user_id=mock_user_id, items=items)
+        
+        assert saved == 2
+        upsert = mock_client.table.return_value.upsert
+        upsert.assert_called_once()
+        assert [r["url"] for r in upsert.call_args[0][0]] == ["https://example.com/a", "https://example.com/b"]
+        assert upsert.call_args[1]["on_conflict"] == "user_id,url"
+    
+    @patch('services.supabase_client.get_client')
+    def test_cost_trends_with_summary_converts_cents(self, mock_get_client):
+        """Test that the trends RPC result is reshaped into dollar points and summary tiles"""
+        mock_client = Mock()
+        mock_client.rpc.return_value.execute.return_value.data = {
+            "total_cents": 250, "mean_cents": 125, "max_cents": 200,
+            "points": [{"date": "2026-01-01", "cost_cents": 50}, {"date": "2026-01-02", "cost_cents": 200}],
+        }
+        mock_get_client.return_value = mock_client
+        
+        trends = get_cost_trends_with_summary(workspace_id="ws-1", days=2)
+        
+        mock_client.rpc.assert_called_once_with("get_cost_trends_with_summary", {"p_ws": "ws-1", "p_days": 2})
+        assert trends["points"][1] == {"date": "2026-01-02", "cost_cents": 200, "cost_dollars": 2.0}
+        assert trends["total_dollars"] == 2.5
+        assert trends["max_dollars"] == 2.0
+    
+    @patch('services.supabase_client.get_client')
+    def test_analytics_overview_matches_reporter_shapes(self, mock_get_client):
+        """Test that the overview RPC is unpacked into the usage summary and cost breakdown shapes"""
+        mock_client = Mock()
+        mock_client.rpc.return_value.execute.return_value.data = {
+            "total_events": 3, "total_cost_cents": 150,
+            "event_counts": {"api_call": 2, "email_sent": 1},
+            "api_calls_by_provider": {"groq": 2},
+            "storage_bytes": 0, "email_recipients": 4, "items_fetched": 0,
+            "cost_by_event_type": {"api_call": 100, "email_sent": 50},
+            "cost_by_category": {"API Usage": 100, "Email Delivery": 50},
+            "recent_events": [{"event_type": "api_call", "event_name": "groq_chat", "cost_cents": 50, "created_at": "2026-01-01T00:00:00+00:00"}],
+        }
+        mock_get_client.return_value = mock_client
+        
+        overview = get_analytics_overview(workspace_id="ws-1", days=7, recent_limit=1)
+        
+        assert mock_client.rpc.call_count == 1
+        assert overview["usage_summary"]["api_calls"] == {"total": 2, "by_provider": {"groq": 2}}
+        assert overview["usage_summary"]["emails"] == {"sent": 1, "recipients": 4}
+        assert overview["usage_summary"]["content"]["draft_generations"] == 0
+        assert overview["cost_breakdown"]["total_cost_dollars"] == 1.5
+        assert len(overview["recent_events"]) == 1
 
 class TestGroqClient:
     """Test Groq client functions"""
@@ -174,10 +252,12 @@ class TestContentFetcher:
         """Test fetching content from all sources"""
         # Mock sources
         mock_sources = [
-            {"id": "source-1", "source_type": "twitter", "source_value": "@test", "boost_factor": 1.0},
+            {"id": "source-1", "source_type": "twitter", "source_value": "@test", "boost_factor": 3.0},
             {"id": "source-2", "source_type": "rss", "source_value": "https://example.com/feed", "boost_factor": 1.0}
         ]
         mock_list_sources.return_value = mock_sources
+        # save_content_items keeps one row per URL and returns how many it wrote
+        mock_save_items.side_effect = lambda *, user_id, items, workspace_id=None: len({it["url"] for it in items})
         
         # Mock content items
         mock_content = [
@@ -190,8 +270,78 @@ class TestContentFetcher:
             
             result = fetch_all_sources(user_id=mock_user_id, workspace_id=mock_workspace_id)
             
-            assert result == 2  # Should return number of items saved
+            assert result == 2  # Boosted copies count once
             mock_save_items.assert_called_once()
+            assert len(mock_save_items.call_args[1]["items"]) == 4
+
+
+class TestBulkOperations:
+    """Test bulk operation fan-out"""
+    
+    @patch('services.bulk_operations.update_bulk_operation_progress')
+    @patch('services.bulk_operations.get_client')
+    def test_run_for_workspaces_collects_results(self, mock_get_client, mock_update_progress):
+        """Test that every workspace result and progress count is recorded"""
+        from services.bulk_operations import BulkOperationManager
+        
+        def worker(ws_id):
+            if ws_id == "ws-bad":
+                raise RuntimeError("boom")
+            if ws_id == "ws-empty":
+                return {"status": "failed", "error": "No members found"}
+            return {"status": "success"}
+        
+        manager = BulkOperationManager()
+        results, progress = manager._run_for_workspaces(42, ["ws-1", "ws-2", "ws-empty", "ws-bad"], worker)
+        
+        assert progress == {"total": 4, "completed": 2, "failed": 2}
+        assert mock_update_progress.call_count == 4
+        mock_update_progress.assert_called_with(operation_id=42, progress=progress)
+        assert results["ws-1"]["status"] == "success"
+        assert results["ws-bad"] == {"status": "failed", "error": "boom"}
+
+    @patch('services.bulk_operations.update_bulk_operation_progress')
+    @patch('services.bulk_operations.get_client')
+    def test_run_for_workspaces_ignores_progress_errors(self, mock_get_client, mock_update_progress):
+        """Test that a failed progress write does not abort the remaining workspaces"""
+        from services.bulk_operations import BulkOperationManager
+
+        mock_update_progress.side_effect = RuntimeError("db down")
+        manager = BulkOperationManager()
+        results, progress = manager._run_for_workspaces(7, ["ws-1", "ws-2"], lambda ws_id: {"status": "success"})
+
+        assert progress == {"total": 2, "completed": 2, "failed": 0}
+        assert set(results) == {"ws-1", "ws-2"}
+
+    def test_rate_pacer_spaces_calls(self):
+        """Test that paced calls from several threads start at least one interval apart"""
+        import threading
+        import time
+        from services.bulk_operations import _RatePacer
+
+        pacer = _RatePacer(20)
+        starts = []
+        threads = [threading.Thread(target=lambda: (pacer.wait(), starts.append(time.monotonic()))) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        starts.sort()
+        assert all(b - a >= 0.045 for a, b in zip(starts, starts[1:]))
+
+    @patch('services.bulk_operations.update_bulk_operation_status')
+    @patch('services.bulk_operations.get_client')
+    def test_execute_marks_failed_when_lookup_fails(self, mock_get_client, mock_update_status):
+        """Test that a failure before the fan-out still moves the row out of pending"""
+        from services.bulk_operations import BulkOperationManager
+
+        mock_get_client.return_value.table.return_value.select.return_value.eq.return_value.execute.side_effect = RuntimeError("db down")
+        manager = BulkOperationManager()
+        with pytest.raises(RuntimeError):
+            manager.execute_bulk_fetch(9)
+
+        mock_update_status.assert_called_once_with(operation_id=9, status="failed", error_message="db down")
 
 
 class TestAnalyticsService: